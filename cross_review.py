@@ -7,7 +7,7 @@
 2. OpenAI Codex CLI (需要ChatGPT Plus或API密钥)
 
 Usage:
-    python cross_review.py <directory>
+    python cross_review.py <directory> [--no-cache]
     python cross_review.py deepcode_lab/papers/9/generate_code
 
 Features:
@@ -19,11 +19,63 @@ Features:
 """
 
 import asyncio
+import functools
+import hashlib
+import os
 import sys
+import time
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
+
+
+# Review prompts (static text, built once at import time)
+_GEMINI_PROMPT_TEMPLATE = """Review only the following Python files:
+{file_list}
+
+Review them for:
+1. Code quality and maintainability
+2. Security vulnerabilities
+3. Performance issues
+4. Best practices compliance
+5. Bug detection
+
+For each file, provide:
+- Overall score (0-10)
+- Specific issues with severity (CRITICAL/HIGH/MEDIUM/LOW)
+- Line numbers where applicable
+- Concrete recommendations
+
+Format the output as a detailed Markdown report."""
+
+# Plain-text output, and the default approval mode so that headless runs
+# never get to execute edit/shell tools (keeps the review read-only and short)
+_GEMINI_CLI_FLAGS = ("--output-format", "text", "--approval-mode", "default")
+
+_CODEX_PROMPT_TEMPLATE = """Review the Python files in this directory: {directory}
+
+Only review these files (ignore everything else):
+{file_list}
+
+Please perform a comprehensive security and code quality review:
+
+1. Look for security vulnerabilities
+2. Check code quality and best practices
+3. Identify potential bugs or logic errors
+4. Assess performance issues
+5. Review error handling
+6. Check documentation quality
+
+For each file, provide:
+- Overall score (0-10)
+- List of issues with severity (CRITICAL/HIGH/MEDIUM/LOW)
+- Specific recommendations
+
+Save your detailed review analysis to: {codex_output}
+"""
 
 
 def print_banner():
@@ -40,14 +92,112 @@ def print_banner():
     print(banner)
 
 
+# Directories never worth sending to a reviewer
+_SKIP_DIRS = frozenset({".git", "__pycache__", "venv", ".venv", "node_modules"})
+
+# Overall budget for the Gemini review, CLI run plus API fallback (seconds).
+# Codex is interactive (it waits for the user), so it gets no timeout.
+GEMINI_REVIEW_TIMEOUT = 900
+
+# Reports of unchanged code younger than this are reused (seconds)
+REVIEW_CACHE_TTL = 3600
+
+# Upper bound on files listed in a review prompt
+MAX_REVIEW_FILES = 50
+
+
+def find_python_files(directory: Path) -> list[Path]:
+    """递归收集目录下的Python文件（单次遍历，跳过venv/缓存目录）"""
+    py_files = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
+        for name in files:
+            if name.endswith(".py"):
+                py_files.append(Path(root) / name)
+    return py_files
+
+
+def select_review_files(py_files: list[Path], limit: int = MAX_REVIEW_FILES) -> list[Path]:
+    """选择要审阅的文件（最近修改优先，最多limit个）"""
+    if len(py_files) > limit:
+        py_files = sorted(py_files, key=lambda p: p.stat().st_mtime, reverse=True)[:limit]
+    return sorted(py_files)
+
+
+def format_file_list(py_files: list[Path]) -> str:
+    """将文件列表格式化为提示词中的项目列表"""
+    return "\n".join(f"- {p}" for p in py_files)
+
+
+def compute_source_digest(directory: Path, py_files: list[Path]) -> str:
+    """计算源文件内容的SHA-256摘要（路径+内容）"""
+    digest = hashlib.sha256()
+    for path in sorted(py_files):
+        digest.update(str(path.relative_to(directory)).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _digest_sidecar(report: Path) -> Path:
+    """报告对应的摘要文件"""
+    return report.with_name(report.name + ".sha256")
+
+
+def find_cached_report(candidates: list[Path], digest: str) -> Optional[Path]:
+    """查找与当前源码摘要匹配且未过期的报告"""
+    now = time.time()
+    for report in candidates:
+        try:
+            if (_digest_sidecar(report).read_text(encoding="utf-8").strip() == digest
+                    and now - report.stat().st_mtime < REVIEW_CACHE_TTL):
+                return report
+        except OSError:
+            continue
+    return None
+
+
+def store_report_digest(report: str, digest: str) -> None:
+    """记录报告对应的源码摘要（仅在审阅成功后调用）"""
+    _digest_sidecar(Path(report)).write_text(digest, encoding="utf-8")
+
+
+def clear_report_digest(report: Path) -> None:
+    """删除报告的摘要文件（在工具覆盖报告之前调用，失败或中断的输出不会被当作缓存）"""
+    _digest_sidecar(report).unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_review_dir(directory_path: str) -> Path:
+    """返回（并按需创建）审阅报告目录 <directory>/../code_reviews"""
+    review_dir = Path(directory_path).parent / "code_reviews"
+    review_dir.mkdir(parents=True, exist_ok=True)
+    return review_dir
+
+
+@functools.lru_cache(maxsize=None)
+def _which(name: str) -> Optional[str]:
+    """解析可执行文件路径（每个进程只扫描一次PATH）"""
+    return shutil.which(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _find_linux_terminal() -> Optional[str]:
+    """查找第一个可用的Linux终端模拟器"""
+    for terminal in ("gnome-terminal", "konsole", "xterm"):
+        if _which(terminal):
+            return terminal
+    return None
+
+
 def check_gemini_cli_installed() -> bool:
     """检查Gemini CLI是否已安装"""
-    return shutil.which("gemini") is not None
+    return _which("gemini") is not None
 
 
 def check_codex_installed() -> bool:
     """检查Codex CLI是否已安装"""
-    return shutil.which("codex") is not None
+    return _which("codex") is not None
 
 
 async def run_gemini_review(directory_path: str) -> tuple[bool, str]:
@@ -65,8 +215,8 @@ async def run_gemini_review(directory_path: str) -> tuple[bool, str]:
 
         if results["status"] == "success":
             # Save report
-            output_path = Path(directory_path).parent / "code_reviews" / "gemini_review.md"
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path = _ensure_review_dir(directory_path) / "gemini_review.md"
+            clear_report_digest(output_path)
 
             await workflow.generate_review_report(results, str(output_path))
 
@@ -99,7 +249,11 @@ async def run_gemini_review(directory_path: str) -> tuple[bool, str]:
         return False, None
 
 
-def run_gemini_cli_review(directory_path: str) -> tuple[bool, str]:
+async def run_gemini_cli_review(
+    directory_path: str,
+    timestamp: Optional[str] = None,
+    py_files: Optional[list[Path]] = None
+) -> tuple[bool, str]:
     """运行Gemini CLI审阅"""
     print("\n" + "="*70)
     print("📊 STEP 1: Google Gemini CLI Review")
@@ -113,83 +267,120 @@ def run_gemini_cli_review(directory_path: str) -> tuple[bool, str]:
         print("      brew install gemini-cli")
         print("\n   📖 Docs: https://github.com/google-gemini/gemini-cli")
         print("\n   💡 Fallback: Trying Gemini API...")
-        return run_gemini_api_fallback(directory_path)
+        return await run_gemini_api_fallback(directory_path)
 
     print("\n🤖 Gemini CLI detected!")
 
+    timestamp = timestamp or datetime.now().isoformat()
+
     directory = Path(directory_path)
-    review_dir = directory.parent / "code_reviews"
-    review_dir.mkdir(parents=True, exist_ok=True)
+    review_dir = _ensure_review_dir(directory_path)
 
     output_file = review_dir / "gemini_cli_review.md"
 
-    # Create review prompt
-    prompt = f"""Review all Python files in the current directory for:
-1. Code quality and maintainability
-2. Security vulnerabilities
-3. Performance issues
-4. Best practices compliance
-5. Bug detection
-
-For each file, provide:
-- Overall score (0-10)
-- Specific issues with severity (CRITICAL/HIGH/MEDIUM/LOW)
-- Line numbers where applicable
-- Concrete recommendations
-
-Format the output as a detailed Markdown report."""
+    # Scope the review to an explicit list of Python files
+    if py_files is None:
+        py_files = find_python_files(directory)
+    review_files = select_review_files(py_files)
+    prompt = _GEMINI_PROMPT_TEMPLATE.format(file_list=format_file_list(review_files))
 
     print(f"\n   🚀 Running Gemini CLI review...")
     print(f"   📂 Directory: {directory}")
+    print(f"   🐍 Files: {len(review_files)}")
+
+    header = (
+        f"# Gemini CLI Code Review\n\n"
+        f"**Generated**: {timestamp}\n"
+        f"**Directory**: {directory_path}\n"
+        f"**Model**: Gemini 2.5 Pro (via CLI)\n\n"
+        "---\n\n"
+    )
 
+    clear_report_digest(output_file)
     try:
-        # Run gemini CLI with the prompt
-        result = subprocess.run(
-            ["gemini", "-p", prompt, "--include-directories", str(directory)],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minutes timeout
-        )
-
-        if result.returncode == 0:
-            # Save output
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(f"# Gemini CLI Code Review\n\n")
-                f.write(f"**Generated**: {datetime.now().isoformat()}\n")
-                f.write(f"**Directory**: {directory_path}\n")
-                f.write(f"**Model**: Gemini 2.5 Pro (via CLI)\n\n")
-                f.write("---\n\n")
-                f.write(result.stdout)
+        with open(output_file, "wb") as f:
+            f.write(header.encode("utf-8"))
+            f.flush()
+
+            # Run gemini CLI with the prompt (non-blocking, so Codex can run in
+            # parallel); its stdout goes straight to the report file descriptor
+            proc = await asyncio.create_subprocess_exec(
+                "gemini", "-p", prompt, "--include-directories", str(directory),
+                *_GEMINI_CLI_FLAGS,
+                stdout=f,
+                stderr=asyncio.subprocess.PIPE
+            )
 
+            try:
+                _, stderr = await asyncio.wait_for(
+                    proc.communicate(),
+                    timeout=300  # 5 minutes timeout
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+
+        if proc.returncode == 0:
             print(f"\n   ✅ Gemini CLI review completed!")
             print(f"   💾 Report: {output_file}")
             return True, str(output_file)
         else:
-            print(f"\n   ⚠️  Gemini CLI error: {result.stderr}")
+            print(f"\n   ⚠️  Gemini CLI error: {stderr.decode('utf-8', errors='replace')}")
             print("\n   💡 Fallback: Trying Gemini API...")
-            return run_gemini_api_fallback(directory_path)
+            return await run_gemini_api_fallback(directory_path)
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         print(f"\n   ⚠️  Gemini CLI timeout (5min)")
         print("\n   💡 Fallback: Trying Gemini API...")
-        return run_gemini_api_fallback(directory_path)
+        return await run_gemini_api_fallback(directory_path)
     except Exception as e:
         print(f"\n   ⚠️  Gemini CLI error: {e}")
         print("\n   💡 Fallback: Trying Gemini API...")
-        return run_gemini_api_fallback(directory_path)
+        return await run_gemini_api_fallback(directory_path)
 
 
-def run_gemini_api_fallback(directory_path: str) -> tuple[bool, str]:
+async def run_gemini_api_fallback(directory_path: str) -> tuple[bool, str]:
     """Gemini API fallback when CLI not available"""
+    # run_gemini_review handles its own errors; awaiting it directly keeps
+    # failures visible instead of masking them behind a bare except
+    return await run_gemini_review(directory_path)
+
+
+async def run_with_timeout(review, timeout: float, label: str) -> tuple[bool, str]:
+    """为单个审阅任务设置超时，超时视为未完成"""
     try:
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return loop.run_until_complete(run_gemini_review(directory_path))
-    except:
+        return await asyncio.wait_for(review, timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"\n   ⚠️  {label} timed out after {timeout:.0f}s")
         return False, None
 
 
-def run_codex_review(directory_path: str) -> tuple[bool, str]:
+async def run_reviews(*reviews) -> list[tuple[bool, str]]:
+    """并发运行审阅任务；任一任务异常时取消其余任务"""
+    tasks = [asyncio.ensure_future(review) for review in reviews]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+async def skip_review() -> tuple[bool, str]:
+    """占位审阅（工具不可用时）"""
+    return False, None
+
+
+async def reuse_review(report: Path) -> tuple[bool, str]:
+    """复用缓存的审阅报告"""
+    return True, str(report)
+
+
+async def run_codex_review(
+    directory_path: str,
+    py_files: Optional[list[Path]] = None
+) -> tuple[bool, str]:
     """运行Codex CLI审阅"""
     print("\n" + "="*70)
     print("📊 STEP 2: OpenAI Codex CLI Review")
@@ -207,33 +398,23 @@ def run_codex_review(directory_path: str) -> tuple[bool, str]:
     print("\n🤖 Codex CLI detected!")
 
     directory = Path(directory_path)
-    review_dir = directory.parent / "code_reviews"
-    review_dir.mkdir(parents=True, exist_ok=True)
+    review_dir = _ensure_review_dir(directory_path)
 
     codex_output = review_dir / "codex_review.md"
+    clear_report_digest(codex_output)
+    previous_mtime = codex_output.stat().st_mtime_ns if codex_output.exists() else None
 
     # Create a review prompt file for Codex
     prompt_file = review_dir / "codex_review_prompt.txt"
 
-    with open(prompt_file, "w", encoding="utf-8") as f:
-        f.write(f"""Review all Python files in this directory: {directory}
-
-Please perform a comprehensive security and code quality review:
-
-1. Look for security vulnerabilities
-2. Check code quality and best practices
-3. Identify potential bugs or logic errors
-4. Assess performance issues
-5. Review error handling
-6. Check documentation quality
-
-For each file, provide:
-- Overall score (0-10)
-- List of issues with severity (CRITICAL/HIGH/MEDIUM/LOW)
-- Specific recommendations
-
-Save your detailed review analysis to: {codex_output}
-""")
+    if py_files is None:
+        py_files = find_python_files(directory)
+    prompt_text = _CODEX_PROMPT_TEMPLATE.format(
+        directory=directory,
+        file_list=format_file_list(select_review_files(py_files)),
+        codex_output=codex_output
+    )
+    prompt_file.write_text(prompt_text, encoding="utf-8")
 
     print(f"\n   📝 Created review prompt: {prompt_file}")
     print(f"\n   🚀 Launching Codex CLI...")
@@ -243,8 +424,7 @@ Save your detailed review analysis to: {codex_output}
     print(f"      3. In Codex, paste this prompt:")
     print(f"\n" + "-"*70)
 
-    with open(prompt_file, "r") as f:
-        print(f.read())
+    print(prompt_text)
 
     print("-"*70)
     print(f"\n   4. Let Codex analyze the code")
@@ -264,14 +444,15 @@ Save your detailed review analysis to: {codex_output}
             ])
         elif system == "Linux":
             print(f"\n   🎯 Attempting to open terminal...")
-            # Try different terminal emulators
-            for terminal in ["gnome-terminal", "konsole", "xterm"]:
-                if shutil.which(terminal):
-                    subprocess.Popen([
-                        terminal, "--", "bash", "-c",
-                        f"cd {directory} && codex; exec bash"
-                    ])
-                    break
+            terminal = _find_linux_terminal()
+            if terminal:
+                subprocess.Popen([
+                    terminal, "--", "bash", "-c",
+                    f"cd {directory} && codex; exec bash"
+                ])
+            else:
+                print("   ℹ️  No supported terminal emulator found")
+                print(f"   Please manually run: cd {directory} && codex")
     except Exception as e:
         print(f"\n   ℹ️  Could not auto-open terminal: {e}")
         print(f"   Please manually run: cd {directory} && codex")
@@ -281,9 +462,14 @@ Save your detailed review analysis to: {codex_output}
     print(f"   📄 Checking for: {codex_output}")
     print(f"\n   Press Enter when Codex review is saved to the file...")
 
-    input()
+    # Read from stdin in a worker thread so the Gemini review keeps running
+    await asyncio.get_running_loop().run_in_executor(None, input)
 
     if codex_output.exists():
+        if codex_output.stat().st_mtime_ns == previous_mtime:
+            print("\n   ⚠️  Codex review file was not updated (still the previous report)")
+            print(f"   Please save Codex's new review to: {codex_output}")
+            return False, None
         print(f"\n   ✅ Codex review found: {codex_output}")
         return True, str(codex_output)
     else:
@@ -295,57 +481,66 @@ Save your detailed review analysis to: {codex_output}
 def generate_cross_review_summary(
     directory_path: str,
     gemini_report: str,
-    codex_report: str
+    codex_report: str,
+    timestamp: Optional[str] = None
 ) -> str:
     """生成交叉审阅汇总"""
-    directory = Path(directory_path)
-    review_dir = directory.parent / "code_reviews"
+    review_dir = _ensure_review_dir(directory_path)
     summary_file = review_dir / "CROSS_REVIEW_SUMMARY.md"
 
-    lines = [
-        "# Cross-Review Summary Report",
-        f"\n**Generated**: {datetime.now().isoformat()}",
-        f"**Directory**: {directory_path}",
-        f"**Models**: Gemini 2.5 Pro + OpenAI Codex CLI\n",
-        "## Review Status\n"
-    ]
+    timestamp = timestamp or datetime.now().isoformat()
+    gemini_status = (
+        f"- ✅ **Gemini 2.5 Pro**: [View Report](./{Path(gemini_report).name})"
+        if gemini_report else "- ⏸️  **Gemini 2.5 Pro**: Not completed"
+    )
+    codex_status = (
+        f"- ✅ **Codex CLI**: [View Report](./{Path(codex_report).name})"
+        if codex_report else "- ⏸️  **Codex CLI**: Not completed"
+    )
 
-    if gemini_report:
-        lines.append(f"- ✅ **Gemini 2.5 Pro**: [View Report](./{Path(gemini_report).name})")
-    else:
-        lines.append(f"- ⏸️  **Gemini 2.5 Pro**: Not completed")
+    report = f"""# Cross-Review Summary Report
 
-    if codex_report:
-        lines.append(f"- ✅ **Codex CLI**: [View Report](./{Path(codex_report).name})")
-    else:
-        lines.append(f"- ⏸️  **Codex CLI**: Not completed")
-
-    lines.extend([
-        "\n## How to Compare Results\n",
-        "1. **Review both reports**:",
-        f"   - Gemini: `{gemini_report if gemini_report else 'N/A'}`",
-        f"   - Codex: `{codex_report if codex_report else 'N/A'}`\n",
-        "2. **Identify common issues**:",
-        "   - Issues found by both models → High priority",
-        "   - Model-specific findings → Verify manually\n",
-        "3. **Create action plan**:",
-        "   - Prioritize issues by severity and consensus",
-        "   - Address critical issues first",
-        "   - Consider unique insights from each model\n",
-        "## Consensus Issues\n",
-        "<!-- After reviewing both reports, list issues identified by both models -->\n",
-        "TBD - Compare reports manually\n",
-        "## Action Items\n",
-        "- [ ] Review Gemini findings",
-        "- [ ] Review Codex findings",
-        "- [ ] Identify consensus issues",
-        "- [ ] Prioritize fixes",
-        "- [ ] Implement improvements",
-        "- [ ] Re-run reviews to validate fixes\n"
-    ])
-
-    with open(summary_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+**Generated**: {timestamp}
+**Directory**: {directory_path}
+**Models**: Gemini 2.5 Pro + OpenAI Codex CLI
+
+## Review Status
+
+{gemini_status}
+{codex_status}
+
+## How to Compare Results
+
+1. **Review both reports**:
+   - Gemini: `{gemini_report if gemini_report else 'N/A'}`
+   - Codex: `{codex_report if codex_report else 'N/A'}`
+
+2. **Identify common issues**:
+   - Issues found by both models → High priority
+   - Model-specific findings → Verify manually
+
+3. **Create action plan**:
+   - Prioritize issues by severity and consensus
+   - Address critical issues first
+   - Consider unique insights from each model
+
+## Consensus Issues
+
+<!-- After reviewing both reports, list issues identified by both models -->
+
+TBD - Compare reports manually
+
+## Action Items
+
+- [ ] Review Gemini findings
+- [ ] Review Codex findings
+- [ ] Identify consensus issues
+- [ ] Prioritize fixes
+- [ ] Implement improvements
+- [ ] Re-run reviews to validate fixes
+"""
+
+    summary_file.write_text(report, encoding="utf-8")
 
     return str(summary_file)
 
@@ -355,29 +550,40 @@ async def main():
     print_banner()
 
     # Check arguments
-    if len(sys.argv) < 2:
-        print("\nUsage: python cross_review.py <directory_path>\n")
+    args = [arg for arg in sys.argv[1:] if arg != "--no-cache"]
+    use_cache = len(args) == len(sys.argv) - 1
+
+    if not args:
+        print("\nUsage: python cross_review.py <directory_path> [--no-cache]\n")
         print("Example:")
         print("  python cross_review.py deepcode_lab/papers/9/generate_code\n")
 
         # Show recent directories
         deepcode_lab = Path("deepcode_lab/papers")
         if deepcode_lab.exists():
-            generate_code_dirs = sorted(
-                deepcode_lab.glob("*/generate_code"),
-                key=lambda p: p.stat().st_mtime,
-                reverse=True
-            )
-            if generate_code_dirs:
+            generate_code_dirs = list(deepcode_lab.glob("*/generate_code"))
+            # stat/walk calls are I/O bound, so overlap them in a small pool
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                mtimes = list(pool.map(lambda p: p.stat().st_mtime, generate_code_dirs))
+                recent_dirs = [
+                    gdir for _, gdir in sorted(
+                        zip(mtimes, generate_code_dirs),
+                        key=lambda item: item[0],
+                        reverse=True
+                    )[:5]
+                ]
+                py_counts = list(pool.map(
+                    lambda p: sum(1 for _ in p.rglob("*.py")), recent_dirs
+                ))
+            if recent_dirs:
                 print("📁 Recently modified directories:")
-                for i, gdir in enumerate(generate_code_dirs[:5], 1):
-                    py_count = len(list(gdir.rglob("*.py")))
+                for i, (gdir, py_count) in enumerate(zip(recent_dirs, py_counts), 1):
                     if py_count > 0:
                         print(f"   {i}. {gdir} ({py_count} files)")
         print()
         sys.exit(1)
 
-    directory_path = sys.argv[1]
+    directory_path = args[0]
     directory = Path(directory_path)
 
     if not directory.exists():
@@ -385,7 +591,7 @@ async def main():
         sys.exit(1)
 
     # Count Python files
-    py_files = list(directory.rglob("*.py"))
+    py_files = find_python_files(directory)
     if not py_files:
         print(f"\n❌ Error: No Python files found in {directory_path}\n")
         sys.exit(1)
@@ -393,11 +599,56 @@ async def main():
     print(f"\n📁 Target directory: {directory_path}")
     print(f"🐍 Found {len(py_files)} Python file(s)\n")
 
-    # Run Gemini CLI review (with API fallback)
-    gemini_success, gemini_report = run_gemini_cli_review(directory_path)
+    # One timestamp shared by every report of this run
+    run_timestamp = datetime.now().isoformat()
+
+    # Resolve available tools once, so missing CLIs are skipped up front
+    have_gemini = check_gemini_cli_installed()
+    have_codex = check_codex_installed()
+
+    # Reuse recent reports when the source code has not changed
+    review_dir = _ensure_review_dir(directory_path)
+    source_digest = compute_source_digest(directory, py_files)
+    cached_gemini = cached_codex = None
+    if use_cache:
+        cached_gemini = find_cached_report(
+            [review_dir / "gemini_cli_review.md", review_dir / "gemini_review.md"],
+            source_digest
+        )
+        cached_codex = find_cached_report([review_dir / "codex_review.md"], source_digest)
+
+    if cached_gemini:
+        print(f"♻️  Source unchanged, reusing Gemini report: {cached_gemini}")
+        gemini_review = reuse_review(cached_gemini)
+    elif have_gemini:
+        gemini_review = run_gemini_cli_review(
+            directory_path,
+            timestamp=run_timestamp,
+            py_files=py_files
+        )
+    else:
+        print("ℹ️  Gemini CLI not installed, using Gemini API directly")
+        gemini_review = run_gemini_api_fallback(directory_path)
+    gemini_review = run_with_timeout(gemini_review, GEMINI_REVIEW_TIMEOUT, "Gemini review")
+
+    if cached_codex:
+        print(f"♻️  Source unchanged, reusing Codex report: {cached_codex}")
+        codex_review = reuse_review(cached_codex)
+    elif have_codex:
+        codex_review = run_codex_review(directory_path, py_files=py_files)
+    else:
+        print("ℹ️  Codex CLI not installed, skipping Codex review (npm install -g @openai/codex)")
+        codex_review = skip_review()
+
+    # Run Gemini review (with API fallback) and Codex review in parallel
+    (gemini_success, gemini_report), (codex_success, codex_report) = await run_reviews(
+        gemini_review,
+        codex_review
+    )
 
-    # Run Codex review
-    codex_success, codex_report = run_codex_review(directory_path)
+    for success, report in ((gemini_success, gemini_report), (codex_success, codex_report)):
+        if success:
+            store_report_digest(report, source_digest)
 
     # Generate summary
     print("\n" + "="*70)
@@ -407,7 +658,8 @@ async def main():
     summary_file = generate_cross_review_summary(
         directory_path,
         gemini_report if gemini_success else None,
-        codex_report if codex_success else None
+        codex_report if codex_success else None,
+        timestamp=run_timestamp
     )
 
     print(f"\n   ✅ Summary created: {summary_file}")
@@ -17,22 +17,195 @@ Features:
 """
 
 import asyncio
-import subprocess
+import functools
+import hashlib
+import os
 import shutil
 import json
+import mmap
+import re
+import tempfile
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
+
+import aiofiles
+
+# orjson（可选）用于加速报告的JSON序列化
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# CLI原始输出在内存中保留的最大字节数（保留开头部分；完整输出流式写入磁盘）
+MAX_OUTPUT_HEAD = 4 * 1024 * 1024
+
+# 文本审阅解析（fallback）使用的预编译正则
+_SCORE_RE = re.compile(r'score[:\s]+(\d+(?:\.\d+)?)/10', re.IGNORECASE)
+_SEVERITY_RE = re.compile(r'(CRITICAL|HIGH|MEDIUM|LOW)[:\s]+(.*?)(?=\n|$)', re.IGNORECASE)
+
+# 在CLI输出原字符串上增量解析JSON对象
+_JSON_DECODER = json.JSONDecoder()
+
+# 用于匹配共识问题的关键词（按优先级排序）
+CONSENSUS_KEYWORDS = (
+    "device", "gpu", "cuda", "hard-coded", "hardcoded",
+    "eval", "train", "mode", "dropout", "error handling",
+    "exception", "validation"
+)
+
+# 问题dict中参与关键词匹配的描述字段
+ISSUE_TEXT_FIELDS = ("issue", "description", "recommendation")
+
+
+def _issue_text(issue: Any) -> str:
+    """问题的描述文本（小写），只取描述字段而不是整个dict的repr"""
+    if isinstance(issue, dict):
+        return " ".join(
+            str(issue[field]) for field in ISSUE_TEXT_FIELDS if issue.get(field)
+        ).lower()
+    return str(issue).lower()
+
+
+def _issue_keywords(issue: Any) -> Tuple[str, ...]:
+    """提取问题描述中出现的共识关键词（保持CONSENSUS_KEYWORDS中的顺序）"""
+    desc = _issue_text(issue)
+    return tuple(kw for kw in CONSENSUS_KEYWORDS if kw in desc)
+
+
+class _IndexEntry(NamedTuple):
+    """源码索引条目"""
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+def _sha256_file(path: Path) -> str:
+    """计算文件SHA-256（大文件使用mmap避免复制）"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size > 65536:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).hexdigest()
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@functools.lru_cache(maxsize=8)
+def _which(name: str) -> Optional[str]:
+    """缓存的可执行文件查找（每个进程每个工具只扫描一次PATH）"""
+    return shutil.which(name)
+
+
+def _dump_json_bytes(obj: Any, indent: bool = True) -> bytes:
+    """序列化为UTF-8 JSON（默认缩进2格，优先使用orjson）"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+        except TypeError:
+            # orjson不支持的类型（如非字符串键），回退到标准库
+            pass
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def _extract_json(output: bytes) -> Dict[str, Any]:
+    """
+    从CLI输出中解析审阅JSON对象
+
+    从第一个 ```json 代码块（没有则从开头）起用str.find定位每个 "{"，
+    交给raw_decode在原字符串上解析；只返回含overall_score的对象，代码块损坏时
+    不会误取其中嵌套的字典或日志里零散的 {...}（结果会被缓存，宁可报错）。
+    """
+    text = output.decode("utf-8", errors="replace")
+    fence = text.find("```json")
+    start = text.find("{", fence if fence >= 0 else 0)
+    while start >= 0:
+        try:
+            data, end = _JSON_DECODER.raw_decode(text, start)
+        except ValueError:
+            start = text.find("{", start + 1)
+            continue
+        if isinstance(data, dict) and "overall_score" in data:
+            return data
+        start = text.find("{", end)
+    raise ValueError("No review JSON object found in output")
 
 
 class IterativeCodeImprover:
     """迭代代码改进器"""
 
+    # 审阅提示词（类级常量，每次迭代复用）
+    GEMINI_PROMPT = """Review all Python files in this directory comprehensively.
+
+For each file, provide:
+1. Code quality score (0-10)
+2. Issues found with severity (CRITICAL/HIGH/MEDIUM/LOW) and line numbers
+3. Specific recommendations for improvement
+
+Then provide:
+- Overall average score across all files
+- Top 5 most critical issues that need fixing
+- Summary of code quality
+
+Format as JSON with this structure:
+{
+  "files": [
+    {
+      "path": "file.py",
+      "score": 7.5,
+      "issues": [
+        {"severity": "HIGH", "line": 10, "description": "...", "recommendation": "..."}
+      ]
+    }
+  ],
+  "overall_score": 7.2,
+  "critical_issues": [
+    {"file": "file.py", "line": 10, "issue": "...", "severity": "HIGH"}
+  ],
+  "summary": "..."
+}"""
+
+    CODEX_PROMPT = """Review all Python files in this directory comprehensively.
+
+For each file, provide:
+1. Code quality score (0-10)
+2. Issues found with severity (CRITICAL/HIGH/MEDIUM/LOW) and specific line numbers
+3. Concrete recommendations for improvement
+
+Then provide:
+- Overall average score across all files
+- Top 5 most critical issues that need immediate fixing
+- Summary of overall code quality
+
+Format as JSON with this structure:
+{
+  "files": [
+    {
+      "path": "file.py",
+      "score": 7.5,
+      "issues": [
+        {"severity": "HIGH", "line": 10, "description": "...", "recommendation": "..."}
+      ]
+    }
+  ],
+  "overall_score": 7.2,
+  "critical_issues": [
+    {"file": "file.py", "line": 10, "issue": "...", "severity": "HIGH"}
+  ],
+  "summary": "..."
+}"""
+
     def __init__(
         self,
         code_directory: str,
         target_score: float = 8.0,
-        max_iterations: int = 5
+        max_iterations: int = 5,
+        use_cache: bool = True,
+        cache_ttl: float = 24 * 3600,
+        top_k: int = 5,
+        iteration_budget: Optional[float] = None
     ):
         """
         初始化
@@ -41,17 +214,39 @@ class IterativeCodeImprover:
             code_directory: 代码目录路径
             target_score: 目标质量分数 (0-10)
             max_iterations: 最大迭代次数
+            use_cache: 源码未变化时复用缓存的审阅结果
+            cache_ttl: 审阅缓存有效期（秒）
+            top_k: 每次迭代最多修复的共识问题数（按关键词去重后）
+            iteration_budget: 单次迭代的时间预算（秒），超出后取消该迭代；None表示不限制
         """
         self.code_directory = Path(code_directory)
         self.target_score = target_score
         self.max_iterations = max_iterations
+        self.use_cache = use_cache
+        self.cache_ttl = cache_ttl
+        self.top_k = top_k
+        self.iteration_budget = iteration_budget
 
         # 创建输出目录
         self.output_dir = self.code_directory.parent / "iterative_reviews"
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # 审阅历史
+        # 审阅结果缓存（按源码内容哈希）
+        self.cache_dir = self.output_dir / ".review_cache"
+
+        # 审阅历史（每次迭代追加一行到JSONL文件）
         self.review_history = []
+        self._history_file = self.output_dir / "complete_history.jsonl"
+
+        # 可用的审阅工具（run() 中检测）
+        self.tools = {"gemini": False, "codex": False}
+
+        # 源码文件索引 {Path: _IndexEntry}，用于增量计算指纹
+        self._file_index: Dict[Path, _IndexEntry] = {}
+
+        # 上一次审阅时的源码指纹及其共识结果
+        self._last_fp = None
+        self._last_consensus = None
 
     def print_banner(self, text: str, char: str = "="):
         """打印横幅"""
@@ -64,8 +259,8 @@ class IterativeCodeImprover:
         self.print_banner("🔧 Checking Available Tools")
 
         tools = {
-            "gemini": shutil.which("gemini") is not None,
-            "codex": shutil.which("codex") is not None
+            "gemini": _which("gemini") is not None,
+            "codex": _which("codex") is not None
         }
 
         print(f"✅ Gemini CLI: {'Available' if tools['gemini'] else 'Not Found'}")
@@ -83,218 +278,306 @@ class IterativeCodeImprover:
 
         return tools
 
-    def run_gemini_review(self, iteration: int) -> Dict[str, Any]:
-        """运行Gemini审阅"""
-        print("\n📊 Running Gemini CLI Review...")
+    def _refresh_index(self):
+        """增量刷新源码索引：只对mtime或大小变化的文件重新计算哈希"""
+        new_index = {}
+        for path in self.code_directory.rglob("*.py"):
+            st = path.stat()
+            prev = self._file_index.get(path)
+            if prev and prev.mtime_ns == st.st_mtime_ns and prev.size == st.st_size:
+                new_index[path] = prev
+            else:
+                new_index[path] = _IndexEntry(st.st_mtime_ns, st.st_size, _sha256_file(path))
+        self._file_index = new_index
+
+    def _fingerprint_directory(self) -> str:
+        """计算代码目录下所有Python文件内容的组合哈希"""
+        self._refresh_index()
+
+        digest = hashlib.sha256()
+        for rel_path, file_sha in sorted(
+            (str(path.relative_to(self.code_directory)), entry.sha256)
+            for path, entry in self._file_index.items()
+        ):
+            digest.update(f"{rel_path}\0{file_sha}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _cache_key(self, tool: str, prompt: str, fingerprint: Optional[str] = None) -> str:
+        """
+        缓存键：源码指纹 + 工具名 + 提示词
 
-        prompt = """Review all Python files in this directory comprehensively.
+        应在启动CLI之前计算一次，并同时用于读取和写入缓存，
+        这样审阅期间源码发生的变化不会被记到这次审阅结果上。
+        """
+        if fingerprint is None:
+            fingerprint = self._fingerprint_directory()
+        prompt_sha = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{fingerprint}:{tool}:{prompt_sha}".encode("utf-8")
+        ).hexdigest()
+
+    def _load_cached_review(self, tool: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """读取未过期的缓存审阅结果"""
+        if not self.use_cache:
+            return None
+
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        try:
+            if time.time() - cache_file.stat().st_mtime > self.cache_ttl:
+                return None
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
 
-For each file, provide:
-1. Code quality score (0-10)
-2. Issues found with severity (CRITICAL/HIGH/MEDIUM/LOW) and line numbers
-3. Specific recommendations for improvement
+        return {
+            "status": "success",
+            "tool": tool,
+            "data": cached["data"],
+            "raw_file": cached.get("raw_file")
+        }
 
-Then provide:
-- Overall average score across all files
-- Top 5 most critical issues that need fixing
-- Summary of code quality
+    def _store_cached_review(self, cache_key: str, result: Dict[str, Any]):
+        """原子写入审阅结果缓存"""
+        if not self.use_cache:
+            return
 
-Format as JSON with this structure:
-{
-  "files": [
-    {
-      "path": "file.py",
-      "score": 7.5,
-      "issues": [
-        {"severity": "HIGH", "line": 10, "description": "...", "recommendation": "..."}
-      ]
-    }
-  ],
-  "overall_score": 7.2,
-  "critical_issues": [
-    {"file": "file.py", "line": 10, "issue": "...", "severity": "HIGH"}
-  ],
-  "summary": "..."
-}"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"data": result["data"], "raw_file": result["raw_file"]},
+                    f,
+                    ensure_ascii=False
+                )
+            os.replace(tmp_path, cache_file)
+        except OSError as e:
+            print(f"   ⚠️  Failed to write review cache: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    async def _run_cli(
+        self,
+        argv: List[str],
+        timeout: float,
+        cwd: Optional[str] = None,
+        raw_file: Optional[Path] = None,
+        raw_include_stderr: bool = False
+    ) -> Tuple[int, bytes, bytes]:
+        """
+        异步运行CLI命令，返回 (returncode, stdout, stderr)，输出均为原始字节
+
+        如果指定raw_file，stdout会边读取边写入该文件，内存中只保留开头
+        MAX_OUTPUT_HEAD字节用于后续解析（JSON/代码块通常从输出开头附近开始）。
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        async def collect() -> Tuple[bytes, bytes]:
+            if raw_file is None:
+                return await proc.communicate()
+
+            # 并行读取stderr，避免管道写满导致子进程阻塞
+            stderr_task = asyncio.ensure_future(proc.stderr.read())
+            head = bytearray()
+            try:
+                async with aiofiles.open(raw_file, "wb") as f:
+                    while True:
+                        chunk = await proc.stdout.read(65536)
+                        if not chunk:
+                            break
+                        await f.write(chunk)
+                        if len(head) < MAX_OUTPUT_HEAD:
+                            head += chunk[:MAX_OUTPUT_HEAD - len(head)]
+                    stderr = await stderr_task
+                    if raw_include_stderr:
+                        await f.write(stderr)
+            finally:
+                stderr_task.cancel()
+            await proc.wait()
+            return bytes(head), stderr
 
         try:
-            result = subprocess.run(
+            stdout, stderr = await asyncio.wait_for(collect(), timeout=timeout)
+        finally:
+            # 超时、外层取消（迭代预算用尽）或写盘失败时都要结束子进程，避免遗留孤儿进程
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+        return proc.returncode, stdout, stderr
+
+    async def run_gemini_review(self, iteration: int, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """运行Gemini审阅"""
+        print("\n📊 Running Gemini CLI Review...")
+
+        prompt = self.GEMINI_PROMPT
+        cache_key = self._cache_key("gemini", prompt, fingerprint)
+
+        cached = self._load_cached_review("gemini", cache_key)
+        if cached:
+            print("   ♻️  Source unchanged, using cached Gemini review")
+            print(f"   📊 Overall Score: {cached['data'].get('overall_score', 'N/A')}/10")
+            return cached
+
+        try:
+            # 完整输出直接流式保存到磁盘
+            output_file = self.output_dir / f"iteration_{iteration}_gemini_raw.txt"
+            returncode, stdout, stderr = await self._run_cli(
                 ["gemini", "-p", prompt, "--include-directories", str(self.code_directory)],
-                capture_output=True,
-                text=True,
-                timeout=180
+                timeout=180,
+                raw_file=output_file
             )
 
-            if result.returncode == 0:
-                # 保存完整输出
-                output_file = self.output_dir / f"iteration_{iteration}_gemini_raw.txt"
-                with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(result.stdout)
-
+            if returncode == 0:
                 # 尝试解析JSON
                 try:
-                    # 提取JSON部分
-                    output = result.stdout
-                    if "```json" in output:
-                        json_start = output.find("```json") + 7
-                        json_end = output.find("```", json_start)
-                        json_str = output[json_start:json_end].strip()
-                    elif "{" in output:
-                        json_start = output.find("{")
-                        json_end = output.rfind("}") + 1
-                        json_str = output[json_start:json_end]
-                    else:
-                        json_str = output
-
-                    review_data = json.loads(json_str)
+                    review_data = _extract_json(stdout)
                     print(f"   ✅ Gemini review completed")
                     print(f"   📊 Overall Score: {review_data.get('overall_score', 'N/A')}/10")
-                    return {
+                    result = {
                         "status": "success",
                         "tool": "gemini",
                         "data": review_data,
-                        "raw_output": output
+                        "raw_file": str(output_file)
                     }
+                    self._store_cached_review(cache_key, result)
+                    return result
 
-                except json.JSONDecodeError as e:
+                except ValueError as e:
                     print(f"   ⚠️  JSON parsing failed: {e}")
                     print(f"   📄 Using raw text analysis")
                     return {
                         "status": "partial",
                         "tool": "gemini",
-                        "data": self.parse_text_review(result.stdout),
-                        "raw_output": result.stdout
+                        "data": self.parse_text_review(stdout.decode("utf-8", errors="replace")),
+                        "raw_file": str(output_file)
                     }
             else:
-                print(f"   ❌ Gemini failed: {result.stderr}")
-                return {"status": "failed", "tool": "gemini", "error": result.stderr}
+                error = stderr.decode("utf-8", errors="replace")
+                print(f"   ❌ Gemini failed: {error}")
+                return {"status": "failed", "tool": "gemini", "error": error}
 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             print(f"   ⚠️  Gemini timeout")
             return {"status": "failed", "tool": "gemini", "error": "Timeout"}
         except Exception as e:
             print(f"   ❌ Error: {e}")
             return {"status": "failed", "tool": "gemini", "error": str(e)}
 
-    def run_codex_review(self, iteration: int) -> Dict[str, Any]:
+    async def run_codex_review(self, iteration: int, fingerprint: Optional[str] = None) -> Dict[str, Any]:
         """运行Codex审阅"""
         print("\n🤖 Running Codex CLI Review...")
 
-        prompt = """Review all Python files in this directory comprehensively.
+        prompt = self.CODEX_PROMPT
+        cache_key = self._cache_key("codex", prompt, fingerprint)
 
-For each file, provide:
-1. Code quality score (0-10)
-2. Issues found with severity (CRITICAL/HIGH/MEDIUM/LOW) and specific line numbers
-3. Concrete recommendations for improvement
-
-Then provide:
-- Overall average score across all files
-- Top 5 most critical issues that need immediate fixing
-- Summary of overall code quality
-
-Format as JSON with this structure:
-{
-  "files": [
-    {
-      "path": "file.py",
-      "score": 7.5,
-      "issues": [
-        {"severity": "HIGH", "line": 10, "description": "...", "recommendation": "..."}
-      ]
-    }
-  ],
-  "overall_score": 7.2,
-  "critical_issues": [
-    {"file": "file.py", "line": 10, "issue": "...", "severity": "HIGH"}
-  ],
-  "summary": "..."
-}"""
+        cached = self._load_cached_review("codex", cache_key)
+        if cached:
+            print("   ♻️  Source unchanged, using cached Codex review")
+            print(f"   📊 Overall Score: {cached['data'].get('overall_score', 'N/A')}/10")
+            return cached
 
         try:
-            result = subprocess.run(
+            # 完整输出（stdout + stderr）直接流式保存到磁盘
+            output_file = self.output_dir / f"iteration_{iteration}_codex_raw.txt"
+            _, stdout, stderr = await self._run_cli(
                 ["codex", "exec", prompt],
+                timeout=180,
                 cwd=str(self.code_directory),
-                capture_output=True,
-                text=True,
-                timeout=180
+                raw_file=output_file,
+                raw_include_stderr=True
             )
 
-            output = result.stdout + result.stderr
+            output = stdout + stderr
 
             # 检查订阅问题
-            if "upgrade to Plus" in output:
+            if b"upgrade to Plus" in output:
                 print(f"   ⚠️  Codex requires ChatGPT Plus subscription")
                 return {"status": "failed", "tool": "codex", "error": "Requires Plus"}
 
-            # 保存完整输出
-            output_file = self.output_dir / f"iteration_{iteration}_codex_raw.txt"
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(output)
-
             # 尝试解析JSON
             try:
-                # 提取JSON部分（Codex输出在最后）
-                if "```json" in output:
-                    json_start = output.find("```json") + 7
-                    json_end = output.find("```", json_start)
-                    json_str = output[json_start:json_end].strip()
-                elif "{" in output:
-                    # 找到最后一个完整的JSON对象
-                    json_start = output.rfind("{")
-                    json_end = output.rfind("}") + 1
-                    json_str = output[json_start:json_end]
-                else:
-                    json_str = output
-
-                review_data = json.loads(json_str)
+                # 提取JSON部分
+                review_data = _extract_json(output)
                 print(f"   ✅ Codex review completed")
                 print(f"   📊 Overall Score: {review_data.get('overall_score', 'N/A')}/10")
-                return {
+                result = {
                     "status": "success",
                     "tool": "codex",
                     "data": review_data,
-                    "raw_output": output
+                    "raw_file": str(output_file)
                 }
+                self._store_cached_review(cache_key, result)
+                return result
 
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 print(f"   ⚠️  JSON parsing failed: {e}")
                 print(f"   📄 Using raw text analysis")
                 return {
                     "status": "partial",
                     "tool": "codex",
-                    "data": self.parse_text_review(output),
-                    "raw_output": output
+                    "data": self.parse_text_review(output.decode("utf-8", errors="replace")),
+                    "raw_file": str(output_file)
                 }
 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             print(f"   ⚠️  Codex timeout")
             return {"status": "failed", "tool": "codex", "error": "Timeout"}
         except Exception as e:
             print(f"   ❌ Error: {e}")
             return {"status": "failed", "tool": "codex", "error": str(e)}
 
+    async def _probe_cli(self, tool: str, timeout: float) -> bool:
+        """检查CLI工具能否在timeout秒内响应 --version"""
+        try:
+            returncode, _, _ = await self._run_cli([tool, "--version"], timeout=timeout)
+        except (asyncio.TimeoutError, OSError):
+            return False
+        return returncode == 0
+
+    async def _wait_for_ready(self, max_wait: float):
+        """每个可用的CLI工具只探测一次（超时max_wait秒，冷启动Node CLI也足够），成功即视为就绪"""
+        tools = [tool for tool in ("gemini", "codex") if self.tools.get(tool)]
+        ready = await asyncio.gather(*[self._probe_cli(tool, max_wait) for tool in tools])
+        for tool, ok in zip(tools, ready):
+            if not ok:
+                print(f"   ⚠️  {tool} did not respond to --version within {max_wait:g}s, continuing anyway")
+
+    async def _skipped(self, tool: str) -> Dict[str, Any]:
+        """未启用工具的占位结果"""
+        return {"status": "skipped", "tool": tool}
+
     def parse_text_review(self, text: str) -> Dict[str, Any]:
         """从文本中解析审阅结果（fallback）"""
-        import re
-
         # 尝试提取分数
-        scores = re.findall(r'score[:\s]+(\d+(?:\.\d+)?)/10', text, re.IGNORECASE)
-        avg_score = sum(float(s) for s in scores) / len(scores) if scores else 5.0
-
-        # 尝试提取问题
+        total = 0.0
+        count = 0
+        for match in _SCORE_RE.finditer(text):
+            total += float(match.group(1))
+            count += 1
+        avg_score = total / count if count else 5.0
+
+        # 尝试提取问题（只需要前5个）
         issues = []
-        severity_pattern = r'(CRITICAL|HIGH|MEDIUM|LOW)[:\s]+(.*?)(?=\n|$)'
-        matches = re.findall(severity_pattern, text, re.IGNORECASE)
-
-        for severity, description in matches:
+        for match in _SEVERITY_RE.finditer(text):
             issues.append({
-                "severity": severity.upper(),
-                "description": description.strip()
+                "severity": match.group(1).upper(),
+                "description": match.group(2).strip()
             })
+            if len(issues) == 5:
+                break
 
         return {
             "overall_score": avg_score,
-            "critical_issues": issues[:5],  # Top 5
+            "critical_issues": issues,  # Top 5
             "summary": "Parsed from text output"
         }
 
@@ -346,33 +629,44 @@ Format as JSON with this structure:
             print(f"   Gemini found: {len(gemini_issues)} critical issues")
             print(f"   Codex found:  {len(codex_issues)} critical issues")
 
-            # 简单的关键词匹配来查找共识
+            # 简单的关键词匹配来查找共识：先为每个问题建立关键词集合，
+            # 再对问题两两求交集
+            gemini_index = [(issue, _issue_keywords(issue)) for issue in gemini_issues]
+            codex_index = [(issue, frozenset(_issue_keywords(issue))) for issue in codex_issues]
+
             consensus_issues = []
-            for g_issue in gemini_issues:
-                g_desc = str(g_issue).lower()
-                for c_issue in codex_issues:
-                    c_desc = str(c_issue).lower()
-                    # 检查是否有共同的关键词
-                    common_keywords = ["device", "gpu", "cuda", "hard-coded", "hardcoded",
-                                     "eval", "train", "mode", "dropout", "error handling",
-                                     "exception", "validation"]
-                    for keyword in common_keywords:
-                        if keyword in g_desc and keyword in c_desc:
-                            consensus_issues.append({
-                                "keyword": keyword,
-                                "gemini_finding": g_issue,
-                                "codex_finding": c_issue,
-                                "priority": "HIGH"
-                            })
-                            break
+            for g_issue, g_keywords in gemini_index:
+                if not g_keywords:
+                    continue
+                for c_issue, c_keywords in codex_index:
+                    # g_keywords保持优先级顺序，取第一个共同关键词
+                    keyword = next((kw for kw in g_keywords if kw in c_keywords), None)
+                    if keyword:
+                        consensus_issues.append({
+                            "keyword": keyword,
+                            "gemini_finding": g_issue,
+                            "codex_finding": c_issue,
+                            "priority": "HIGH"
+                        })
+
+            # 按关键词去重并限制数量，避免重复修复同一类问题
+            seen_keywords = set()
+            deduped_issues = []
+            for issue in consensus_issues:
+                if issue["keyword"] in seen_keywords:
+                    continue
+                seen_keywords.add(issue["keyword"])
+                deduped_issues.append(issue)
+                if len(deduped_issues) >= self.top_k:
+                    break
 
-            consensus["consensus_issues"] = consensus_issues
-            print(f"   ✅ Found {len(consensus_issues)} consensus issues")
+            consensus["consensus_issues"] = deduped_issues
+            print(f"   ✅ Found {len(consensus_issues)} consensus issues "
+                  f"({len(deduped_issues)} unique to fix)")
 
         # 保存报告
         report_file = self.output_dir / f"iteration_{iteration}_consensus.json"
-        with open(report_file, "w", encoding="utf-8") as f:
-            json.dump(consensus, f, indent=2, ensure_ascii=False)
+        report_file.write_bytes(_dump_json_bytes(consensus))
 
         # 生成可读报告
         readable_file = self.output_dir / f"iteration_{iteration}_consensus.md"
@@ -384,29 +678,33 @@ Format as JSON with this structure:
 
     def generate_readable_consensus_report(self, consensus: Dict[str, Any], output_file: Path):
         """生成可读的共识报告"""
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(f"# Cross-Review Consensus Report\n\n")
-            f.write(f"**Iteration:** {consensus['iteration']}\n")
-            f.write(f"**Generated:** {consensus['timestamp']}\n\n")
-
-            f.write(f"## Quality Scores\n\n")
-            if "gemini" in consensus["scores"]:
-                f.write(f"- **Gemini Score:** {consensus['scores']['gemini']}/10\n")
-            if "codex" in consensus["scores"]:
-                f.write(f"- **Codex Score:** {consensus['scores']['codex']}/10\n")
-            f.write(f"- **Average Score:** {consensus['average_score']:.2f}/10\n\n")
-
-            if consensus["consensus_issues"]:
-                f.write(f"## Consensus Issues ({len(consensus['consensus_issues'])})\n\n")
-                f.write("These issues were identified by both AI tools:\n\n")
-
-                for i, issue in enumerate(consensus["consensus_issues"], 1):
-                    f.write(f"### {i}. {issue['keyword'].title()} Issue\n\n")
-                    f.write(f"**Priority:** {issue['priority']}\n\n")
-                    f.write(f"**Gemini Finding:**\n")
-                    f.write(f"```\n{json.dumps(issue['gemini_finding'], indent=2)}\n```\n\n")
-                    f.write(f"**Codex Finding:**\n")
-                    f.write(f"```\n{json.dumps(issue['codex_finding'], indent=2)}\n```\n\n")
+        parts = [
+            "# Cross-Review Consensus Report\n\n",
+            f"**Iteration:** {consensus['iteration']}\n",
+            f"**Generated:** {consensus['timestamp']}\n\n",
+            "## Quality Scores\n\n"
+        ]
+        if "gemini" in consensus["scores"]:
+            parts.append(f"- **Gemini Score:** {consensus['scores']['gemini']}/10\n")
+        if "codex" in consensus["scores"]:
+            parts.append(f"- **Codex Score:** {consensus['scores']['codex']}/10\n")
+        parts.append(f"- **Average Score:** {consensus['average_score']:.2f}/10\n\n")
+
+        if consensus["consensus_issues"]:
+            parts.append(f"## Consensus Issues ({len(consensus['consensus_issues'])})\n\n")
+            parts.append("These issues were identified by both AI tools:\n\n")
+
+            for i, issue in enumerate(consensus["consensus_issues"], 1):
+                gemini_json = _dump_json_bytes(issue["gemini_finding"]).decode("utf-8")
+                codex_json = _dump_json_bytes(issue["codex_finding"]).decode("utf-8")
+                parts.append(f"### {i}. {issue['keyword'].title()} Issue\n\n")
+                parts.append(f"**Priority:** {issue['priority']}\n\n")
+                parts.append("**Gemini Finding:**\n")
+                parts.append(f"```\n{gemini_json}\n```\n\n")
+                parts.append("**Codex Finding:**\n")
+                parts.append(f"```\n{codex_json}\n```\n\n")
+
+        output_file.write_text("".join(parts), encoding="utf-8")
 
     async def apply_improvements(self, consensus: Dict[str, Any], iteration: int) -> bool:
         """应用改进（使用两个AI协同修改代码）"""
@@ -418,19 +716,21 @@ Format as JSON with this structure:
 
         print(f"   📝 Found {len(consensus['consensus_issues'])} consensus issues to fix")
 
-        # 为每个共识问题生成修复提示
-        for i, issue in enumerate(consensus["consensus_issues"], 1):
-            print(f"\n   Fixing issue {i}/{len(consensus['consensus_issues'])}: {issue['keyword']}")
-
-            # 构建修复提示
-            fix_prompt = f"""Fix the following issue in the codebase:
+        issues = consensus["consensus_issues"]
 
-Issue: {issue['keyword']}
+        # 将所有共识问题合并为一个修复提示（只调用一次Codex）
+        issue_list = "\n\n".join(
+            f"""{i}. Issue: {issue['keyword']}
 
 Gemini identified: {json.dumps(issue['gemini_finding'], indent=2)}
-Codex identified: {json.dumps(issue['codex_finding'], indent=2)}
+Codex identified: {json.dumps(issue['codex_finding'], indent=2)}"""
+            for i, issue in enumerate(issues, 1)
+        )
+        fix_prompt = f"""Fix the following {len(issues)} issues in the codebase:
 
-Please:
+{issue_list}
+
+For each issue, please:
 1. Locate the relevant files and lines
 2. Apply the necessary fixes
 3. Ensure the fix follows best practices
@@ -438,54 +738,80 @@ Please:
 
 Make the changes directly to the files."""
 
-            # 使用Codex进行修改（如果可用，使用workspace-write模式）
-            try:
-                result = subprocess.run(
-                    ["codex", "exec", "--sandbox", "workspace-write", fix_prompt],
-                    cwd=str(self.code_directory),
-                    capture_output=True,
-                    text=True,
-                    timeout=120
-                )
+        keywords = ", ".join(issue["keyword"] for issue in issues)
+        print(f"\n   Fixing {len(issues)} issue(s) in one pass: {keywords}")
 
-                output = result.stdout + result.stderr
+        # 使用Codex进行修改（如果可用，使用workspace-write模式）
+        try:
+            _, stdout, stderr = await self._run_cli(
+                ["codex", "exec", "--sandbox", "workspace-write", fix_prompt],
+                timeout=120 * len(issues),
+                cwd=str(self.code_directory)
+            )
 
-                if "upgrade to Plus" in output:
-                    print(f"   ⚠️  Codex requires Plus subscription")
-                    continue
+            output = (stdout + stderr).lower()
 
-                # 检查是否成功应用修改
-                if "file update:" in output.lower() or "diff" in output.lower():
-                    print(f"   ✅ Applied fix for: {issue['keyword']}")
-                else:
-                    print(f"   ⚠️  Fix may not have been applied for: {issue['keyword']}")
+            if b"upgrade to plus" in output:
+                print(f"   ⚠️  Codex requires Plus subscription")
+                return False
 
-            except Exception as e:
-                print(f"   ❌ Failed to apply fix: {e}")
-                continue
+            # 检查是否成功应用修改
+            if b"file update:" in output or b"diff" in output:
+                print(f"   ✅ Applied fixes for: {keywords}")
+            else:
+                print(f"   ⚠️  Fixes may not have been applied for: {keywords}")
+
+        except asyncio.TimeoutError:
+            print("   ⚠️  Codex fix timeout")
+            return False
+        except Exception as e:
+            print(f"   ❌ Failed to apply fixes: {e}")
+            return False
 
         print(f"\n   🎉 Completed applying improvements")
         return True
 
-    async def run_iteration(self, iteration: int, tools: Dict[str, bool]) -> Dict[str, Any]:
+    def _append_history(self, consensus: Dict[str, Any]):
+        """记录一次迭代结果（追加写入，不重写整个历史文件）"""
+        self.review_history.append(consensus)
+        with open(self._history_file, "ab") as f:
+            f.write(_dump_json_bytes(consensus, indent=False) + b"\n")
+
+    async def run_iteration(self, iteration: int) -> Dict[str, Any]:
         """运行一次迭代"""
         self.print_banner(f"🔄 Iteration {iteration}/{self.max_iterations}", "=")
 
-        # 运行两个工具的审阅
-        gemini_result = {"status": "skipped", "tool": "gemini"}
-        codex_result = {"status": "skipped", "tool": "codex"}
-
-        if tools["gemini"]:
-            gemini_result = self.run_gemini_review(iteration)
-
-        if tools["codex"]:
-            codex_result = self.run_codex_review(iteration)
+        fp = self._fingerprint_directory()
+        if fp == self._last_fp and self._last_consensus is not None:
+            # 源码没有变化（上一轮未修改任何文件），直接复用上一轮的共识
+            print("   ♻️  No source changes detected, reusing last consensus")
+            consensus = dict(
+                self._last_consensus,
+                iteration=iteration,
+                timestamp=datetime.now().isoformat(),
+                reused_from=self._last_consensus["iteration"]
+            )
+        else:
+            # 并行运行两个工具的审阅（互不依赖的只读操作）
+            gemini_result, codex_result = await asyncio.gather(
+                self.run_gemini_review(iteration, fp) if self.tools["gemini"] else self._skipped("gemini"),
+                self.run_codex_review(iteration, fp) if self.tools["codex"] else self._skipped("codex")
+            )
 
-        # 生成共识报告
-        consensus = self.generate_consensus_report(gemini_result, codex_result, iteration)
+            # 生成共识报告
+            consensus = self.generate_consensus_report(gemini_result, codex_result, iteration)
+            # 只有所有启用的工具都给出结果时才允许下一轮复用（失败/超时的共识不复用）
+            if all(
+                result["status"] in ("success", "partial")
+                for tool, result in (("gemini", gemini_result), ("codex", codex_result))
+                if self.tools[tool]
+            ):
+                self._last_fp, self._last_consensus = fp, consensus
+            else:
+                self._last_fp, self._last_consensus = None, None
 
         # 保存到历史
-        self.review_history.append(consensus)
+        self._append_history(consensus)
 
         # 检查是否达到目标
         if consensus["average_score"] >= self.target_score:
@@ -508,22 +834,34 @@ Make the changes directly to the files."""
         print(f"🎯 Target Score: {self.target_score}/10")
         print(f"🔄 Max Iterations: {self.max_iterations}")
 
+        # 新的运行从空历史开始
+        self._history_file.unlink(missing_ok=True)
+
         # 检查工具可用性
-        tools = self.check_tools_available()
-        if not tools["gemini"] and not tools["codex"]:
+        self.tools = self.check_tools_available()
+        if not self.tools["gemini"] and not self.tools["codex"]:
             print("\n❌ Cannot proceed without review tools")
             return
 
         # 迭代改进
         for iteration in range(1, self.max_iterations + 1):
-            consensus = await self.run_iteration(iteration, tools)
+            try:
+                # 取消会传递到正在运行的CLI子进程（由_run_cli负责结束进程）
+                consensus = await asyncio.wait_for(
+                    self.run_iteration(iteration),
+                    timeout=self.iteration_budget
+                )
+            except asyncio.TimeoutError:
+                print(f"\n   ⚠️  Iteration {iteration} exceeded its "
+                      f"{self.iteration_budget:g}s budget, stopping")
+                break
 
             if consensus["average_score"] >= self.target_score:
                 break
 
             if iteration < self.max_iterations:
-                print(f"\n   ⏳ Waiting 5 seconds before next iteration...")
-                await asyncio.sleep(5)
+                print("\n   ⏳ Waiting for review tools before next iteration...")
+                await self._wait_for_ready(max_wait=5.0)
 
         # 生成最终报告
         self.generate_final_report()
@@ -555,12 +893,8 @@ Make the changes directly to the files."""
             print(f"⚠️  Did not reach target score (current: {final_score:.2f}, target: {self.target_score})")
             print(f"   Consider running more iterations or adjusting target")
 
-        # 保存完整历史
-        history_file = self.output_dir / "complete_history.json"
-        with open(history_file, "w", encoding="utf-8") as f:
-            json.dump(self.review_history, f, indent=2, ensure_ascii=False)
-
-        print(f"\n💾 Complete history saved: {history_file}")
+        # 完整历史已在每次迭代时追加写入
+        print(f"\n💾 Complete history saved: {self._history_file}")
         print(f"📁 All reports saved in: {self.output_dir}")
 
 
@@ -568,20 +902,41 @@ async def main():
     """主函数"""
     import sys
 
-    if len(sys.argv) < 2:
-        print("Usage: python iterative_code_improvement.py <code_directory> [target_score] [max_iterations]")
+    args = []
+    use_cache = True
+    iteration_budget = None
+    argv = iter(sys.argv[1:])
+    for arg in argv:
+        if arg == "--no-cache":
+            use_cache = False
+        elif arg == "--iteration-budget" or arg.startswith("--iteration-budget="):
+            value = arg.partition("=")[2] or next(argv, "")
+            try:
+                iteration_budget = float(value)
+            except ValueError:
+                print(f"❌ Invalid --iteration-budget value: {value!r} (expected seconds)")
+                sys.exit(1)
+        else:
+            args.append(arg)
+
+    if not args:
+        print("Usage: python iterative_code_improvement.py <code_directory> [target_score] [max_iterations] "
+              "[--no-cache] [--iteration-budget SECONDS]")
         print("\nExample:")
         print("  python iterative_code_improvement.py deepcode_lab/papers/1/generate_code 8.0 5")
+        print("  python iterative_code_improvement.py deepcode_lab/papers/1/generate_code 8.0 5 --iteration-budget 900")
         sys.exit(1)
 
-    code_directory = sys.argv[1]
-    target_score = float(sys.argv[2]) if len(sys.argv) > 2 else 8.0
-    max_iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    code_directory = args[0]
+    target_score = float(args[1]) if len(args) > 1 else 8.0
+    max_iterations = int(args[2]) if len(args) > 2 else 5
 
     improver = IterativeCodeImprover(
         code_directory=code_directory,
         target_score=target_score,
-        max_iterations=max_iterations
+        max_iterations=max_iterations,
+        use_cache=use_cache,
+        iteration_budget=iteration_budget
     )
 
     await improver.run()
@@ -9,11 +9,66 @@ Quick Cross Review and Fix
 - 迭代改进直到达标
 """
 
-import subprocess
+import asyncio
+import hashlib
+import heapq
+import os
 import shutil
+import string
 import json
+import tempfile
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+# orjson（可选）用于加速提示构建和审阅结果解析中的JSON处理
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+REVIEW_CACHE_NAME = ".review_cache.json"
+
+# Gemini和Codex共用的审阅提示模板（$files为本批次的文件列表）
+_REVIEW_TEMPLATE = string.Template("""Review these Python files: $files
+
+The full source of each file is provided in the input between
+<<FILE path=...>> and <<END FILE>> markers. Review that content directly.
+
+For EACH file, provide:
+1. Code quality score (0-10)
+2. Issues with severity (CRITICAL/HIGH/MEDIUM/LOW) and EXACT line numbers
+3. Specific recommendations
+
+Then provide overall assessment with top 5 most critical issues to fix.
+
+Output VALID JSON only:
+{
+  "files": [
+    {
+      "path": "filename.py",
+      "score": 7.0,
+      "issues": [
+        {"severity": "HIGH", "line": 10, "description": "...", "recommendation": "..."}
+      ]
+    }
+  ],
+  "overall_score": 7.0,
+  "top_issues": [
+    {"file": "file.py", "line": 10, "severity": "HIGH", "issue": "...", "fix": "..."}
+  ]
+}""")
+_REVIEW_TMPL = _REVIEW_TEMPLATE.substitute
+
+# 提示模板的哈希，作为缓存键的一部分：修改提示后旧的审阅结果自动失效
+_REVIEW_PROMPT_HASH = hashlib.sha256(_REVIEW_TEMPLATE.template.encode("utf-8")).hexdigest()[:16]
+
+# 单个审阅批次的上限：约20K token（按4字符/token估算），每批最多8个文件
+MAX_BATCH_CHARS = 80_000
+MAX_BATCH_FILES = 8
 
 
 def print_banner(text: str):
@@ -23,6 +78,359 @@ def print_banner(text: str):
     print("=" * 70)
 
 
+async def run_cli(
+    argv: List[str], cwd: Path, timeout: float, input_text: Optional[str] = None
+) -> Tuple[int, str, str]:
+    """异步运行CLI命令，返回 (returncode, stdout, stderr)；超时时结束子进程"""
+    proc = await asyncio.create_subprocess_exec(
+        *argv,
+        cwd=str(cwd),
+        stdin=asyncio.subprocess.PIPE if input_text is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdin_data = input_text.encode("utf-8") if input_text is not None else None
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(stdin_data), timeout=timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return (
+        proc.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace")
+    )
+
+
+def review_cache_path(code_directory: Path) -> Path:
+    """审阅缓存文件路径（与iterative_code_improvement的输出目录一致）"""
+    return code_directory.parent / "iterative_reviews" / REVIEW_CACHE_NAME
+
+
+def review_cache_key(cli: str, name: str, digest: str) -> str:
+    """审阅缓存键：CLI名称 + 提示模板哈希 + 文件路径 + 文件内容哈希"""
+    return f"{cli}:{_REVIEW_PROMPT_HASH}:{name}:{digest}"
+
+
+def load_review_cache(code_directory: Path) -> dict:
+    """加载审阅缓存（丢弃由其他提示模板生成的旧条目）"""
+    try:
+        raw = review_cache_path(code_directory).read_bytes()
+        cache = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict):
+        return {}
+    return {
+        key: entry for key, entry in cache.items()
+        if key.split(":", 2)[1:2] == [_REVIEW_PROMPT_HASH]
+    }
+
+
+def save_review_cache(code_directory: Path, cache: dict):
+    """原子写入审阅缓存"""
+    cache_file = review_cache_path(code_directory)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_file)
+    except OSError as e:
+        print(f"⚠️  Failed to write review cache: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+# 文件哈希索引：路径 -> (mtime_ns, size, sha256)
+_FILE_HASHES: Dict[str, Tuple[int, int, str]] = {}
+
+
+def file_sha256(file_path: Path) -> str:
+    """
+    计算文件内容的SHA-256
+
+    先stat一次，mtime_ns和大小都未变化时直接返回上次的哈希，只有文件被修改过
+    才重新读取内容。
+    """
+    key = str(file_path)
+    st = os.stat(key)
+    entry = _FILE_HASHES.get(key)
+    if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        return entry[2]
+
+    digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+    _FILE_HASHES[key] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def split_cached_files(
+    model: str, code_directory: Path, core_files: list, cache: Optional[dict]
+) -> Tuple[Dict[str, str], Dict[str, dict], list]:
+    """
+    按文件路径和内容哈希查询缓存，返回 (文件哈希, 命中的缓存条目, 需要重新审阅的文件)
+    """
+    hashes = {name: file_sha256(code_directory / name) for name in core_files}
+    if cache is None:
+        return hashes, {}, list(core_files)
+
+    cached = {}
+    missing = []
+    for name, digest in hashes.items():
+        entry = cache.get(review_cache_key(model, name, digest))
+        if entry is not None:
+            cached[name] = entry
+        else:
+            missing.append(name)
+    return hashes, cached, missing
+
+
+def merge_cached_review(
+    model: str,
+    data: Optional[dict],
+    hashes: Dict[str, str],
+    cached: Dict[str, dict],
+    cache: Optional[dict]
+) -> dict:
+    """
+    将新审阅结果按文件写入缓存，并与命中的缓存条目合并成完整结果
+    """
+    files = []
+    top_issues = []
+    if data is not None:
+        # 以缓存为准，忽略模型对已缓存文件的重复输出
+        files = [
+            f for f in data["files"]
+            if Path(f["path"]).name not in cached
+        ]
+        top_issues = [
+            issue for issue in data["top_issues"]
+            if Path(issue["file"]).name not in cached
+        ]
+        if cache is not None:
+            for file_entry in files:
+                name = Path(file_entry["path"]).name
+                if name not in hashes:
+                    continue
+                cache[review_cache_key(model, name, hashes[name])] = {
+                    "file": file_entry,
+                    "top_issues": [
+                        issue for issue in top_issues
+                        if Path(issue["file"]).name == name
+                    ]
+                }
+
+    if not cached:
+        return data
+
+    for entry in cached.values():
+        files.append(entry["file"])
+        top_issues.extend(entry["top_issues"])
+
+    scores = [f["score"] for f in files if f["score"] is not None]
+    if scores:
+        overall_score = round(sum(scores) / len(scores), 2)
+    else:
+        overall_score = data["overall_score"] if data else 0.0
+
+    return {"files": files, "overall_score": overall_score, "top_issues": top_issues}
+
+
+def invalidate_review_cache(cache: Optional[dict], filename: str):
+    """删除某个文件的所有缓存条目（修复后调用）"""
+    if cache is None:
+        return
+    stale = [
+        key for key, entry in cache.items()
+        if Path(entry["file"]["path"]).name == filename
+    ]
+    for key in stale:
+        del cache[key]
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _is_review_object(data) -> bool:
+    """是否为审阅结果对象（而不是嵌套在其中的某个issue/file字典）"""
+    return isinstance(data, dict) and ("overall_score" in data or "files" in data)
+
+
+def extract_json(output: str) -> dict:
+    """
+    从CLI输出中解析JSON对象
+
+    从最后一个 ```json 代码块（没有则从开头）起向前扫描，用raw_decode直接在
+    原字符串上解析，遇到日志里零散的大括号时跳到下一个 "{" 继续。
+    只接受包含 overall_score 或 files 的对象，代码块损坏时不会退而返回
+    其中嵌套的字典。
+    """
+    fence = output.rfind("```json")
+    if ORJSON_AVAILABLE and fence >= 0:
+        # 快速路径：完整的代码块直接交给orjson
+        fence_end = output.find("```", fence + 7)
+        if fence_end >= 0:
+            try:
+                data = orjson.loads(output[fence + 7:fence_end])
+                if _is_review_object(data):
+                    return data
+            except ValueError:
+                pass
+
+    start = output.find("{", fence if fence >= 0 else 0)
+    while start >= 0:
+        try:
+            data, _ = _JSON_DECODER.raw_decode(output, start)
+            if _is_review_object(data):
+                return data
+        except ValueError:
+            pass
+        start = output.find("{", start + 1)
+    raise ValueError("No review JSON found in output")
+
+
+class FileReview(TypedDict):
+    """单个文件的审阅结果"""
+    path: str
+    score: Optional[float]
+    issues: list
+
+
+class TopIssue(TypedDict):
+    """需要优先修复的问题（模型返回的其他字段原样保留）"""
+    file: str
+    line: int
+    severity: str
+    issue: str
+    fix: str
+
+
+class ReviewData(TypedDict):
+    """规范化后的审阅结果"""
+    files: List[FileReview]
+    overall_score: float
+    top_issues: List[TopIssue]
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def normalize_review(data: dict) -> ReviewData:
+    """
+    解析时一次性校验并规范化审阅结果
+
+    缺失或类型错误的字段在这里补齐/转换，之后的匹配、合并和修复代码直接用
+    下标访问，无需再到处写 .get(key, default)。
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Review output is not a JSON object")
+
+    files = [
+        {
+            **f,
+            "path": str(f.get("path", "")),
+            "score": _as_float(f.get("score")),
+            "issues": f.get("issues") if isinstance(f.get("issues"), list) else []
+        }
+        for f in data.get("files") or []
+        if isinstance(f, dict)
+    ]
+    top_issues = [
+        {
+            **t,
+            "file": str(t.get("file", "")),
+            "line": _as_int(t.get("line")),
+            "severity": str(t.get("severity", "")).upper(),
+            "issue": str(t.get("issue", "")),
+            "fix": str(t.get("fix", ""))
+        }
+        for t in data.get("top_issues") or []
+        if isinstance(t, dict)
+    ]
+    return {
+        "files": files,
+        "overall_score": _as_float(data.get("overall_score")) or 0.0,
+        "top_issues": top_issues
+    }
+
+
+def dumps_indented(obj) -> str:
+    """序列化为缩进2格的JSON字符串（优先使用orjson）"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            # orjson不支持的类型（如非字符串键），回退到标准库
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def build_review_batches(
+    code_directory: Path,
+    files: list,
+    max_chars: int = MAX_BATCH_CHARS,
+    max_files: int = MAX_BATCH_FILES
+) -> List[List[Tuple[str, str]]]:
+    """读取文件内容并按字符预算分批，返回 [[(文件名, 内容), ...], ...]"""
+    batches = []
+    current = []
+    current_chars = 0
+    for name in files:
+        text = (code_directory / name).read_text(encoding="utf-8", errors="replace")
+        if current and (current_chars + len(text) > max_chars or len(current) >= max_files):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append((name, text))
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_file_blocks(batch: List[Tuple[str, str]]) -> str:
+    """把一批文件内容拼成内联的文件块"""
+    return "\n".join(
+        f"<<FILE path={name}>>\n{text}\n<<END FILE>>" for name, text in batch
+    )
+
+
+def combine_review_batches(results: list) -> dict:
+    """合并多个批次的审阅结果"""
+    if len(results) == 1:
+        return results[0]
+
+    files = []
+    top_issues = []
+    for data in results:
+        files.extend(data["files"])
+        top_issues.extend(data["top_issues"])
+
+    scores = [f["score"] for f in files if f["score"] is not None]
+    if not scores:
+        scores = [data["overall_score"] for data in results]
+    return {
+        "files": files,
+        "overall_score": round(sum(scores) / len(scores), 2),
+        "top_issues": top_issues
+    }
+
+
 def get_core_files(code_directory: Path) -> list:
     """获取核心文件列表（避免审阅太多文件导致超时）"""
     # 优先审阅这些核心文件
@@ -31,149 +439,115 @@ def get_core_files(code_directory: Path) -> list:
         "config.py", "utils.py", "train.py", "test.py"
     ]
 
-    core_files = []
-    for filename in priority_files:
-        file_path = code_directory / filename
-        if file_path.exists():
-            core_files.append(filename)
+    # 一次scandir得到所有顶层Python文件，之后的检查都是内存中的集合查找
+    with os.scandir(code_directory) as it:
+        names = {e.name for e in it if e.is_file() and e.name.endswith(".py")}
+
+    core_files = [filename for filename in priority_files if filename in names]
 
     if not core_files:
-        # 如果没有找到优先文件，获取所有顶层Python文件
-        core_files = [f.name for f in code_directory.glob("*.py")][:5]
+        # 如果没有找到优先文件，按文件名取前5个顶层Python文件（部分排序即可）
+        core_files = heapq.nsmallest(5, names)
 
     return core_files
 
 
-def run_gemini_review(code_directory: Path, core_files: list) -> dict:
-    """运行Gemini审阅"""
+async def run_gemini_review(code_directory: Path, core_files: list, cache: Optional[dict] = None) -> dict:
+    """运行Gemini审阅（内容未变化的文件直接复用缓存结果）"""
     print_banner("📊 Gemini CLI Review")
 
-    files_str = " ".join(core_files)
-    prompt = f"""Review these Python files: {files_str}
-
-For EACH file, provide:
-1. Code quality score (0-10)
-2. List of issues with severity (CRITICAL/HIGH/MEDIUM/LOW) and exact line numbers
-3. Specific recommendations
-
-Then provide overall assessment with top 5 most critical issues to fix.
+    hashes, cached, missing = split_cached_files("gemini", code_directory, core_files, cache)
+    if not missing:
+        data = merge_cached_review("gemini", None, hashes, cached, cache)
+        print("♻️  All files unchanged, reusing cached Gemini review")
+        print(f"✅ Gemini Score: {data['overall_score']}/10")
+        return {"status": "success", "data": data}
+    if cached:
+        print(f"♻️  Reusing cached review for {len(cached)} unchanged files")
 
-Output VALID JSON only:
-{{
-  "files": [
-    {{
-      "path": "filename.py",
-      "score": 7.0,
-      "issues": [
-        {{"severity": "HIGH", "line": 10, "description": "...", "recommendation": "..."}}
-      ]
-    }}
-  ],
-  "overall_score": 7.0,
-  "top_issues": [
-    {{"file": "file.py", "line": 10, "severity": "HIGH", "issue": "...", "fix": "..."}}
-  ]
-}}"""
+    batches = build_review_batches(code_directory, missing)
+    if len(batches) > 1:
+        print(f"📦 Reviewing {len(missing)} files in {len(batches)} batches")
 
     try:
-        result = subprocess.run(
-            ["gemini", "-p", prompt],
-            cwd=str(code_directory),
-            capture_output=True,
-            text=True,
-            timeout=90
-        )
+        results = []
+        for batch in batches:
+            files_str = " ".join(name for name, _ in batch)
+            prompt = _REVIEW_TMPL(files=files_str)
+
+            # 文件内容通过stdin传入，CLI无需再逐个读取文件
+            returncode, output, _ = await run_cli(
+                ["gemini", "-p", prompt],
+                code_directory,
+                timeout=90,
+                input_text=format_file_blocks(batch)
+            )
 
-        if result.returncode == 0:
-            output = result.stdout
+            if returncode != 0:
+                print(f"❌ Gemini exited with code {returncode}")
+                return {"status": "failed"}
 
-            # 提取JSON
-            if "```json" in output:
-                json_start = output.find("```json") + 7
-                json_end = output.find("```", json_start)
-                json_str = output[json_start:json_end].strip()
-            else:
-                # 找最后一个完整的JSON对象
-                json_start = output.find("{")
-                json_end = output.rfind("}") + 1
-                json_str = output[json_start:json_end]
+            results.append(normalize_review(extract_json(output)))
 
-            data = json.loads(json_str)
-            print(f"✅ Gemini Score: {data.get('overall_score', 0)}/10")
-            print(f"📋 Found {len(data.get('top_issues', []))} top issues")
-            return {"status": "success", "data": data}
+        data = merge_cached_review("gemini", combine_review_batches(results), hashes, cached, cache)
+        print(f"✅ Gemini Score: {data['overall_score']}/10")
+        print(f"📋 Found {len(data['top_issues'])} top issues")
+        return {"status": "success", "data": data}
 
+    except asyncio.TimeoutError:
+        print("❌ Gemini error: timed out after 90s")
     except Exception as e:
         print(f"❌ Gemini error: {e}")
 
     return {"status": "failed"}
 
 
-def run_codex_review(code_directory: Path, core_files: list) -> dict:
-    """运行Codex审阅"""
+async def run_codex_review(code_directory: Path, core_files: list, cache: Optional[dict] = None) -> dict:
+    """运行Codex审阅（内容未变化的文件直接复用缓存结果）"""
     print_banner("🤖 Codex CLI Review")
 
-    files_str = ", ".join(core_files)
-    prompt = f"""Review these Python files: {files_str}
-
-For EACH file, provide:
-1. Code quality score (0-10)
-2. Issues with severity (CRITICAL/HIGH/MEDIUM/LOW) and EXACT line numbers
-3. Specific recommendations
-
-Then provide overall assessment with top 5 most critical issues.
+    hashes, cached, missing = split_cached_files("codex", code_directory, core_files, cache)
+    if not missing:
+        data = merge_cached_review("codex", None, hashes, cached, cache)
+        print("♻️  All files unchanged, reusing cached Codex review")
+        print(f"✅ Codex Score: {data['overall_score']}/10")
+        return {"status": "success", "data": data}
+    if cached:
+        print(f"♻️  Reusing cached review for {len(cached)} unchanged files")
 
-Output VALID JSON only:
-{{
-  "files": [
-    {{
-      "path": "filename.py",
-      "score": 7.0,
-      "issues": [
-        {{"severity": "HIGH", "line": 10, "description": "...", "recommendation": "..."}}
-      ]
-    }}
-  ],
-  "overall_score": 7.0,
-  "top_issues": [
-    {{"file": "file.py", "line": 10, "severity": "HIGH", "issue": "...", "fix": "..."}}
-  ]
-}}"""
+    batches = build_review_batches(code_directory, missing)
+    if len(batches) > 1:
+        print(f"📦 Reviewing {len(missing)} files in {len(batches)} batches")
 
     try:
-        result = subprocess.run(
-            ["codex", "exec", prompt],
-            cwd=str(code_directory),
-            capture_output=True,
-            text=True,
-            timeout=90
-        )
+        results = []
+        for batch in batches:
+            files_str = ", ".join(name for name, _ in batch)
+            prompt = _REVIEW_TMPL(files=files_str)
+
+            # "-" 让codex从stdin读取完整提示（包含文件内容）
+            _, stdout, stderr = await run_cli(
+                ["codex", "exec", "-"],
+                code_directory,
+                timeout=90,
+                input_text=f"{prompt}\n\n{format_file_blocks(batch)}"
+            )
 
-        output = result.stdout + result.stderr
+            output = stdout + stderr
 
-        if "upgrade to Plus" in output:
-            print("⚠️  Codex requires Plus subscription")
-            return {"status": "skipped"}
-
-        # 提取JSON（Codex输出在最后）
-        if "```json" in output:
-            json_start = output.find("```json") + 7
-            json_end = output.find("```", json_start)
-            json_str = output[json_start:json_end].strip()
-        else:
-            # 找最后一个完整的JSON
-            json_start = output.rfind("{")
-            json_end = output.rfind("}") + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = output[json_start:json_end]
-            else:
-                raise ValueError("No JSON found in output")
+            if "upgrade to Plus" in output:
+                print("⚠️  Codex requires Plus subscription")
+                return {"status": "skipped"}
 
-        data = json.loads(json_str)
-        print(f"✅ Codex Score: {data.get('overall_score', 0)}/10")
-        print(f"📋 Found {len(data.get('top_issues', []))} top issues")
+            results.append(normalize_review(extract_json(output)))
+
+        data = merge_cached_review("codex", combine_review_batches(results), hashes, cached, cache)
+        print(f"✅ Codex Score: {data['overall_score']}/10")
+        print(f"📋 Found {len(data['top_issues'])} top issues")
         return {"status": "success", "data": data}
 
+    except asyncio.TimeoutError:
+        print("❌ Codex error: timed out after 90s")
     except Exception as e:
         print(f"❌ Codex error: {e}")
 
@@ -184,26 +558,32 @@ def find_consensus_issues(gemini_data: dict, codex_data: dict) -> list:
     """查找共识问题"""
     print_banner("🔍 Finding Consensus Issues")
 
-    gemini_issues = gemini_data.get("top_issues", [])
-    codex_issues = codex_data.get("top_issues", [])
+    gemini_issues = gemini_data["top_issues"]
+    codex_issues = codex_data["top_issues"]
 
     print(f"Gemini: {len(gemini_issues)} issues")
     print(f"Codex:  {len(codex_issues)} issues")
 
     consensus = []
 
+    # 按 (文件, 行号//5) 建立Codex问题索引；每个问题同时放入相邻的三个桶，
+    # 这样±5行窗口内的候选只需一次查找
+    codex_idx = defaultdict(list)
+    for c_issue in codex_issues:
+        c_file = c_issue["file"]
+        c_bucket = c_issue["line"] // 5
+        for d in (-1, 0, 1):
+            codex_idx[(c_file, c_bucket + d)].append(c_issue)
+
     # 按文件和行号匹配
     for g_issue in gemini_issues:
-        g_file = g_issue.get("file", "")
-        g_line = g_issue.get("line", 0)
-        g_severity = g_issue.get("severity", "")
+        g_file = g_issue["file"]
+        g_line = g_issue["line"]
+        g_severity = g_issue["severity"]
 
-        for c_issue in codex_issues:
-            c_file = c_issue.get("file", "")
-            c_line = c_issue.get("line", 0)
-
-            # 检查是否是同一个问题（同文件，行号接近）
-            if g_file == c_file and abs(g_line - c_line) <= 5:
+        # 桶内按Codex原始顺序排列，取第一个行号接近的问题
+        for c_issue in codex_idx.get((g_file, g_line // 5), ()):
+            if abs(g_line - c_issue["line"]) <= 5:
                 consensus.append({
                     "file": g_file,
                     "line": g_line,
@@ -214,82 +594,202 @@ def find_consensus_issues(gemini_data: dict, codex_data: dict) -> list:
                 break
 
     print(f"\n✅ Found {len(consensus)} consensus issues")
-    return consensus
-
 
-def apply_fix(code_directory: Path, issue: dict, iteration: int) -> bool:
-    """应用单个修复"""
-    file_path = code_directory / issue["file"]
+    merged = merge_overlapping_issues(consensus)
+    if len(merged) < len(consensus):
+        print(f"🔗 Merged overlapping issues: {len(consensus)} → {len(merged)}")
+    return merged
+
+
+SEVERITY_RANK = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+
+
+def merge_overlapping_issues(consensus: list, window: int = 10) -> list:
+    """
+    合并同一文件中位置相近（相邻条目行号相差不超过window）的共识问题
+
+    合并后的条目用一个修复提示描述整个行范围，gemini_issue/codex_issue
+    变为列表，避免对同一热点重复调用Codex产生冲突的补丁。
+    """
+    merged = []
+    for issue in sorted(consensus, key=lambda x: (x["file"], x["line"])):
+        last = merged[-1] if merged else None
+        if (
+            last is not None
+            and last["file"] == issue["file"]
+            and issue["line"] - last.get("end_line", last["line"]) <= window
+        ):
+            if "end_line" not in last:
+                last["gemini_issue"] = [last["gemini_issue"]]
+                last["codex_issue"] = [last["codex_issue"]]
+            last["end_line"] = issue["line"]
+            last["gemini_issue"].append(issue["gemini_issue"])
+            # 同一个Codex问题可能匹配多个Gemini问题，只保留一份
+            if not any(c is issue["codex_issue"] for c in last["codex_issue"]):
+                last["codex_issue"].append(issue["codex_issue"])
+            if SEVERITY_RANK.get(issue["severity"], 4) < SEVERITY_RANK.get(last["severity"], 4):
+                last["severity"] = issue["severity"]
+        else:
+            merged.append(dict(issue))
+    return merged
+
+
+def issue_location(issue: dict) -> str:
+    """问题位置描述（合并后的问题为行范围）"""
+    if "end_line" in issue:
+        return f"lines {issue['line']}-{issue['end_line']}"
+    return f"around line {issue['line']}"
+
+
+async def apply_fix(
+    code_directory: Path, issues: list, iteration: int, cache: Optional[dict] = None
+) -> int:
+    """
+    在一次Codex会话中修复同一文件的所有问题，返回成功修复数量
+
+    成功后使该文件的审阅缓存失效。
+    """
+    filename = issues[0]["file"]
+    lines = ", ".join(
+        f"{issue['line']}-{issue['end_line']}" if "end_line" in issue else str(issue["line"])
+        for issue in issues
+    )
+    label = f"{filename}:{lines}"
+    file_path = code_directory / filename
     if not file_path.exists():
-        print(f"   ⚠️  File not found: {issue['file']}")
-        return False
+        print(f"   ⚠️  File not found: {filename}")
+        return 0
 
-    print(f"\n   🔧 Fixing: {issue['file']}:{issue['line']}")
-    print(f"      Severity: {issue['severity']}")
+    print(f"\n   🔧 Fixing: {label}")
+    print(f"      Severity: {', '.join(issue['severity'] for issue in issues)}")
 
-    # 构建修复提示
-    fix_prompt = f"""Fix this issue in {issue['file']} around line {issue['line']}:
+    # 构建修复提示（同一文件的问题合并到一个提示中，省去多次CLI启动）
+    issue_blocks = "\n\n".join(
+        f"""Issue {i} ({issue_location(issue)}):
+Gemini found: {dumps_indented(issue['gemini_issue'])}
+Codex found: {dumps_indented(issue['codex_issue'])}"""
+        for i, issue in enumerate(issues, 1)
+    )
+    fix_prompt = f"""Fix the following {len(issues)} issue(s) in {filename}:
 
-Gemini found: {json.dumps(issue['gemini_issue'], indent=2)}
-Codex found: {json.dumps(issue['codex_issue'], indent=2)}
+{issue_blocks}
 
 Please:
-1. Read the file {issue['file']}
-2. Locate line {issue['line']} and surrounding code
-3. Apply the necessary fix following both recommendations
-4. Make the change directly to the file
-5. Confirm the fix was applied
+1. Read the file {filename}
+2. Locate each listed line ({lines}) and surrounding code
+3. Apply the necessary fixes following both recommendations
+4. Make the changes directly to the file
+5. Confirm the fixes were applied
 
-Make minimal changes - only fix this specific issue."""
+Make minimal changes - only fix these specific issues."""
 
     try:
-        result = subprocess.run(
+        _, stdout, stderr = await run_cli(
             ["codex", "exec", "--sandbox", "workspace-write", fix_prompt],
-            cwd=str(code_directory),
-            capture_output=True,
-            text=True,
-            timeout=60
+            code_directory,
+            timeout=60 * len(issues)
         )
+        output = stdout + stderr
 
-        if "upgrade to Plus" in result.stdout + result.stderr:
-            print(f"   ⚠️  Codex requires Plus")
-            return False
+        if "upgrade to Plus" in output:
+            print(f"   ⚠️  [{label}] Codex requires Plus")
+            return 0
 
         # 检查是否成功
-        output = result.stdout + result.stderr
         if "file update:" in output.lower() or "diff" in output.lower():
-            print(f"   ✅ Fix applied")
-            return True
+            print(f"   ✅ [{label}] Fix applied")
+            invalidate_review_cache(cache, Path(filename).name)
+            return len(issues)
         elif "applied" in output.lower() or "fixed" in output.lower():
-            print(f"   ✅ Fix applied")
-            return True
+            print(f"   ✅ [{label}] Fix applied")
+            invalidate_review_cache(cache, Path(filename).name)
+            return len(issues)
         else:
-            print(f"   ⚠️  Fix may not have been applied")
+            print(f"   ⚠️  [{label}] Fix may not have been applied")
             # 打印输出帮助调试
             print(f"   Output preview: {output[:200]}")
-            return False
+            return 0
 
-    except subprocess.TimeoutExpired:
-        print(f"   ⚠️  Timeout while applying fix")
-        return False
+    except asyncio.TimeoutError:
+        print(f"   ⚠️  [{label}] Timeout while applying fix")
+        return 0
     except Exception as e:
-        print(f"   ❌ Error applying fix: {e}")
-        return False
-
-
-def main():
+        print(f"   ❌ [{label}] Error applying fix: {e}")
+        return 0
+
+
+async def apply_fixes(
+    code_directory: Path,
+    issues: list,
+    iteration: int,
+    max_parallel: int = 4,
+    cache: Optional[dict] = None
+) -> int:
+    """
+    并行应用修复，返回成功数量
+
+    每个文件只启动一次Codex（该文件的问题在同一会话中修复，避免写冲突），
+    不同文件之间最多max_parallel个并发，以免触发Codex的速率限制。
+    """
+    by_file = {}
+    for issue in issues:
+        by_file.setdefault(issue["file"], []).append(issue)
+
+    semaphore = asyncio.Semaphore(max_parallel)
+
+    async def fix_file(file_issues: list) -> int:
+        async with semaphore:
+            return await apply_fix(code_directory, file_issues, iteration, cache)
+
+    results = await asyncio.gather(*(fix_file(group) for group in by_file.values()))
+    return sum(results)
+
+
+async def skip_review() -> dict:
+    """工具不可用时的占位审阅结果"""
+    return {"status": "skipped"}
+
+
+async def run_reviews(
+    code_directory: Path,
+    core_files: list,
+    cache: Optional[dict],
+    has_gemini: bool,
+    has_codex: bool
+) -> Tuple[dict, dict]:
+    """并行运行两个审阅（二者互相独立，都在等待LLM响应）"""
+    gemini_result, codex_result = await asyncio.gather(
+        run_gemini_review(code_directory, core_files, cache) if has_gemini else skip_review(),
+        run_codex_review(code_directory, core_files, cache) if has_codex else skip_review(),
+        return_exceptions=True
+    )
+    if cache is not None:
+        save_review_cache(code_directory, cache)
+    if isinstance(gemini_result, Exception):
+        print(f"❌ Gemini error: {gemini_result}")
+        gemini_result = {"status": "failed"}
+    if isinstance(codex_result, Exception):
+        print(f"❌ Codex error: {codex_result}")
+        codex_result = {"status": "failed"}
+    return gemini_result, codex_result
+
+
+async def main():
     """主函数"""
     import sys
 
-    if len(sys.argv) < 2:
-        print("Usage: python quick_cross_review_and_fix.py <code_directory> [target_score] [max_iterations]")
+    use_cache = "--no-cache" not in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--no-cache"]
+
+    if not args:
+        print("Usage: python quick_cross_review_and_fix.py <code_directory> [target_score] [max_iterations] [--no-cache]")
         print("\nExample:")
         print("  python quick_cross_review_and_fix.py deepcode_lab/papers/1/generate_code 8.0 3")
         sys.exit(1)
 
-    code_directory = Path(sys.argv[1])
-    target_score = float(sys.argv[2]) if len(sys.argv) > 2 else 8.0
-    max_iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    code_directory = Path(args[0])
+    target_score = float(args[1]) if len(args) > 1 else 8.0
+    max_iterations = int(args[2]) if len(args) > 2 else 3
 
     if not code_directory.exists():
         print(f"❌ Directory not found: {code_directory}")
@@ -314,20 +814,47 @@ def main():
     core_files = get_core_files(code_directory)
     print(f"\n📝 Reviewing {len(core_files)} core files: {', '.join(core_files)}")
 
+    # 按文件内容哈希缓存审阅结果，未修改的文件不再重复审阅
+    cache = load_review_cache(code_directory) if use_cache else None
+
+    # 上一轮没有成功应用任何修复时，代码未变化，直接复用上一轮审阅结果
+    last_results = None
+    applied_any_fix = False
+    # 提前启动的下一轮审阅（与迭代间的等待时间重叠）
+    pending_reviews = None
+    # 上一轮的平均分，用于检测分数停滞
+    prev_score = None
+
     # 迭代改进
     for iteration in range(1, max_iterations + 1):
-        print_banner(f"🔄 Iteration {iteration}/{max_iterations}")
+        if pending_reviews is None:
+            # 已提前启动的审阅在上一轮末尾就打印了本轮标题
+            print_banner(f"🔄 Iteration {iteration}/{max_iterations}")
+
+        if last_results is not None and not applied_any_fix:
+            print("♻️  No fixes applied in the previous iteration, reusing its review results")
+            gemini_result, codex_result = last_results
+        else:
+            if pending_reviews is None:
+                pending_reviews = asyncio.create_task(
+                    run_reviews(code_directory, core_files, cache, has_gemini, has_codex)
+                )
+            gemini_result, codex_result = await pending_reviews
+            pending_reviews = None
+            # 只复用两个工具都成功（或未启用）的审阅，失败/超时的结果下一轮重新审阅
+            if all(r["status"] in ("success", "skipped") for r in (gemini_result, codex_result)):
+                last_results = (gemini_result, codex_result)
+            else:
+                last_results = None
 
-        # 运行审阅
-        gemini_result = run_gemini_review(code_directory, core_files) if has_gemini else {"status": "skipped"}
-        codex_result = run_codex_review(code_directory, core_files) if has_codex else {"status": "skipped"}
+        applied_any_fix = False
 
         # 计算平均分数
         scores = []
         if gemini_result["status"] == "success":
-            scores.append(gemini_result["data"].get("overall_score", 0))
+            scores.append(gemini_result["data"]["overall_score"])
         if codex_result["status"] == "success":
-            scores.append(codex_result["data"].get("overall_score", 0))
+            scores.append(codex_result["data"]["overall_score"])
 
         if not scores:
             print("\n❌ No successful reviews")
@@ -351,26 +878,36 @@ def main():
 
             if not consensus_issues:
                 print("\n⚠️  No consensus issues found to fix")
-                continue
-
-            # 应用修复
-            print_banner(f"🔧 Applying Fixes - Iteration {iteration}")
-            fixed_count = 0
-
-            for i, issue in enumerate(consensus_issues, 1):
-                print(f"\n[{i}/{len(consensus_issues)}]")
-                if apply_fix(code_directory, issue, iteration):
-                    fixed_count += 1
-
-            print(f"\n✅ Applied {fixed_count}/{len(consensus_issues)} fixes")
+            else:
+                # 应用修复
+                print_banner(f"🔧 Applying Fixes - Iteration {iteration}")
+                fixed_count = await apply_fixes(code_directory, consensus_issues, iteration, cache=cache)
+                if cache is not None:
+                    save_review_cache(code_directory, cache)
+
+                print(f"\n✅ Applied {fixed_count}/{len(consensus_issues)} fixes")
+                applied_any_fix = fixed_count > 0
+
+        # 分数与上一轮相比基本不变且本轮没有成功修复：后续迭代只会得到相同结果
+        if prev_score is not None and abs(avg_score - prev_score) < 0.1 and not applied_any_fix:
+            print(f"\n⏹️  Score plateaued at {avg_score:.2f}/10 "
+                  f"(previous {prev_score:.2f}) with no fixes applied, stopping early")
+            break
+        prev_score = avg_score
 
-        if iteration < max_iterations:
+        # 没有修复时下一轮直接复用本轮结果，无需等待
+        if iteration < max_iterations and applied_any_fix:
             print(f"\n⏳ Waiting 3 seconds before next iteration...")
-            import time
-            time.sleep(3)
+            # 下一轮审阅现在就启动，子进程启动和LLM请求与等待时间重叠；
+            # 先打印下一轮标题，审阅输出才会出现在正确的迭代下
+            print_banner(f"🔄 Iteration {iteration + 1}/{max_iterations}")
+            pending_reviews = asyncio.create_task(
+                run_reviews(code_directory, core_files, cache, has_gemini, has_codex)
+            )
+            await asyncio.sleep(3)
 
     print_banner("🎉 Review and Fix Complete")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1090,7 +1090,7 @@ def handle_iterative_improvement(
 
             # Check for reports
             review_dir = Path(code_directory).parent / "iterative_reviews"
-            history_file = review_dir / "complete_history.json"
+            history_file = review_dir / "complete_history.jsonl"
 
             if history_file.exists():
                 st.success(f"📄 Complete history saved: {history_file}")
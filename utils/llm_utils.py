@@ -5,14 +5,54 @@ This module provides common LLM-related utilities to avoid circular imports
 and reduce code duplication across the project.
 """
 
+import importlib
 import os
 import yaml
-from typing import Any, Type, Dict, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Type, Dict, Mapping, Tuple
 
-# Import LLM classes
-from mcp_agent.workflows.llm.augmented_llm_anthropic import AnthropicAugmentedLLM
-from mcp_agent.workflows.llm.augmented_llm_openai import OpenAIAugmentedLLM
-from mcp_agent.workflows.llm.augmented_llm_ollama import OllamaAugmentedLLM
+# Prefer the libyaml-backed loader; fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# LLM classes by provider, imported lazily so only the selected vendor SDK is loaded
+_LLM_CLASSES = {
+    "anthropic": ("mcp_agent.workflows.llm.augmented_llm_anthropic", "AnthropicAugmentedLLM"),
+    "openai": ("mcp_agent.workflows.llm.augmented_llm_openai", "OpenAIAugmentedLLM"),
+    "ollama": ("mcp_agent.workflows.llm.augmented_llm_ollama", "OllamaAugmentedLLM"),
+}
+
+
+def _import_llm_class(provider: str) -> Type[Any]:
+    """Import and return the AugmentedLLM class for the given provider."""
+    module_name, class_name = _LLM_CLASSES[provider]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+@lru_cache(maxsize=32)
+def _load_yaml_cached(path: str, mtime_ns: int) -> Any:
+    """
+    Read and parse a YAML file, memoized on (path, mtime_ns).
+
+    The mtime is part of the key so editing the file invalidates the entry
+    automatically. The returned object is shared between callers and must be
+    treated as read-only.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def _load_yaml(path: str) -> Any:
+    """Load a YAML config file through the mtime-keyed cache."""
+    return _load_yaml_cached(path, os.stat(path).st_mtime_ns)
+
+
+def clear_config_cache() -> None:
+    """Drop all cached YAML configs (e.g. in tests that rewrite config files)."""
+    _load_yaml_cached.cache_clear()
 
 
 def get_preferred_llm_class(config_path: str = "mcp_agent.secrets.yaml", main_config_path: str = "mcp_agent.config.yaml") -> Type[Any]:
@@ -35,24 +75,22 @@ def get_preferred_llm_class(config_path: str = "mcp_agent.secrets.yaml", main_co
     try:
         # First check main config for default provider
         if os.path.exists(main_config_path):
-            with open(main_config_path, "r", encoding="utf-8") as f:
-                main_config = yaml.safe_load(f)
+            main_config = _load_yaml(main_config_path)
 
             default_provider = main_config.get("default_llm_provider", "").lower()
             if default_provider == "ollama":
                 print("🤖 Using OllamaAugmentedLLM (default_llm_provider=ollama)")
-                return OllamaAugmentedLLM
+                return _import_llm_class("ollama")
             elif default_provider == "anthropic":
                 print("🤖 Using AnthropicAugmentedLLM (default_llm_provider=anthropic)")
-                return AnthropicAugmentedLLM
+                return _import_llm_class("anthropic")
             elif default_provider == "openai":
                 print("🤖 Using OpenAIAugmentedLLM (default_llm_provider=openai)")
-                return OpenAIAugmentedLLM
+                return _import_llm_class("openai")
 
         # Fallback to checking API keys in secrets file
         if os.path.exists(config_path):
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
+            config = _load_yaml(config_path)
 
             # Check for anthropic API key
             anthropic_config = config.get("anthropic", {})
@@ -60,25 +98,42 @@ def get_preferred_llm_class(config_path: str = "mcp_agent.secrets.yaml", main_co
 
             if anthropic_key and anthropic_key.strip() and anthropic_key != "":
                 print("🤖 Using AnthropicAugmentedLLM (Anthropic API key found)")
-                return AnthropicAugmentedLLM
+                return _import_llm_class("anthropic")
 
             # Check for ollama configuration
             ollama_config = config.get("ollama", {})
             if ollama_config:
                 print("🤖 Using OllamaAugmentedLLM (Ollama config found)")
-                return OllamaAugmentedLLM
+                return _import_llm_class("ollama")
 
             # Default to OpenAI
             print("🤖 Using OpenAIAugmentedLLM (default)")
-            return OpenAIAugmentedLLM
+            return _import_llm_class("openai")
         else:
             print(f"🤖 Config file {config_path} not found, using OpenAIAugmentedLLM")
-            return OpenAIAugmentedLLM
+            return _import_llm_class("openai")
 
     except Exception as e:
         print(f"🤖 Error reading config file: {e}")
         print("🤖 Falling back to OpenAIAugmentedLLM")
-        return OpenAIAugmentedLLM
+        return _import_llm_class("openai")
+
+
+# Fallback values used when a config file or key is missing
+_DEFAULT_MODELS = MappingProxyType({
+    "anthropic": "claude-sonnet-4-20250514",
+    "openai": "o3-mini",
+    "ollama": "qwen3-coder:30b",
+})
+_DEFAULT_SEGMENTATION = MappingProxyType({
+    "enabled": True,
+    "size_threshold_chars": 50000,
+})
+
+
+def _config_section(config: Any, section: str) -> Mapping[str, Any]:
+    """Return a top-level config section, treating a missing or null value as empty."""
+    return (config or {}).get(section) or {}
 
 
 def get_default_models(config_path: str = "mcp_agent.config.yaml"):
@@ -93,40 +148,18 @@ def get_default_models(config_path: str = "mcp_agent.config.yaml"):
     """
     try:
         if os.path.exists(config_path):
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-
-            # Handle null values in config sections
-            anthropic_config = config.get("anthropic") or {}
-            openai_config = config.get("openai") or {}
-            ollama_config = config.get("ollama") or {}
-
-            anthropic_model = anthropic_config.get(
-                "default_model", "claude-sonnet-4-20250514"
-            )
-            openai_model = openai_config.get("default_model", "o3-mini")
-            ollama_model = ollama_config.get("default_model", "qwen3-coder:30b")
-
+            config = _load_yaml(config_path)
             return {
-                "anthropic": anthropic_model,
-                "openai": openai_model,
-                "ollama": ollama_model,
+                provider: _config_section(config, provider).get("default_model", default)
+                for provider, default in _DEFAULT_MODELS.items()
             }
         else:
             print(f"Config file {config_path} not found, using default models")
-            return {
-                "anthropic": "claude-sonnet-4-20250514",
-                "openai": "o3-mini",
-                "ollama": "qwen3-coder:30b",
-            }
+            return dict(_DEFAULT_MODELS)
 
     except Exception as e:
         print(f"❌Error reading config file {config_path}: {e}")
-        return {
-            "anthropic": "claude-sonnet-4-20250514",
-            "openai": "o3-mini",
-            "ollama": "qwen3-coder:30b",
-        }
+        return dict(_DEFAULT_MODELS)
 
 
 def get_document_segmentation_config(
@@ -143,25 +176,21 @@ def get_document_segmentation_config(
     """
     try:
         if os.path.exists(config_path):
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
-
-            # Get document segmentation config with defaults
-            seg_config = config.get("document_segmentation", {})
+            seg_config = _config_section(_load_yaml(config_path), "document_segmentation")
             return {
-                "enabled": seg_config.get("enabled", True),
-                "size_threshold_chars": seg_config.get("size_threshold_chars", 50000),
+                key: seg_config.get(key, default)
+                for key, default in _DEFAULT_SEGMENTATION.items()
             }
         else:
             print(
                 f"📄 Config file {config_path} not found, using default segmentation settings"
             )
-            return {"enabled": True, "size_threshold_chars": 50000}
+            return dict(_DEFAULT_SEGMENTATION)
 
     except Exception as e:
         print(f"📄 Error reading segmentation config from {config_path}: {e}")
         print("📄 Using default segmentation settings")
-        return {"enabled": True, "size_threshold_chars": 50000}
+        return dict(_DEFAULT_SEGMENTATION)
 
 
 def should_use_document_segmentation(
@@ -199,6 +228,10 @@ def should_use_document_segmentation(
         )
 
 
+# Server added to every agent depending on whether document segmentation is used
+_SERVER_ADDITIONS = {True: "document-segmentation", False: "filesystem"}
+
+
 def get_adaptive_agent_config(
     use_segmentation: bool, search_server_names: list = None
 ) -> Dict[str, list]:
@@ -212,42 +245,31 @@ def get_adaptive_agent_config(
     Returns:
         Dict containing server configurations for different agents
     """
-    if search_server_names is None:
-        search_server_names = []
-
-    # Base configuration
-    config = {
-        "concept_analysis": [],
-        "algorithm_analysis": search_server_names.copy(),
-        "code_planner": search_server_names.copy(),
+    # The mode server is the only one for concept analysis and is appended once to the rest
+    extra = _SERVER_ADDITIONS[bool(use_segmentation)]
+    base = list(search_server_names or ())
+    servers = base if extra in base else base + [extra]
+
+    return {
+        "concept_analysis": [extra],
+        "algorithm_analysis": servers,
+        "code_planner": list(servers),
     }
 
-    # Add document-segmentation server if needed
-    if use_segmentation:
-        config["concept_analysis"] = ["document-segmentation"]
-        if "document-segmentation" not in config["algorithm_analysis"]:
-            config["algorithm_analysis"].append("document-segmentation")
-        if "document-segmentation" not in config["code_planner"]:
-            config["code_planner"].append("document-segmentation")
-    else:
-        config["concept_analysis"] = ["filesystem"]
-        if "filesystem" not in config["algorithm_analysis"]:
-            config["algorithm_analysis"].append("filesystem")
-        if "filesystem" not in config["code_planner"]:
-            config["code_planner"].append("filesystem")
 
-    return config
-
-
-def get_adaptive_prompts(use_segmentation: bool) -> Dict[str, str]:
+@lru_cache(maxsize=2)
+def get_adaptive_prompts(use_segmentation: bool) -> Mapping[str, str]:
     """
     Get appropriate prompt versions based on segmentation usage.
 
+    Results are built once per mode and shared, so they are returned as
+    read-only mappings.
+
     Args:
         use_segmentation: Whether to use segmented reading prompts
 
     Returns:
-        Dict containing prompt configurations
+        Read-only mapping containing prompt configurations
     """
     # Import here to avoid circular imports
     from prompts.code_prompts import (
@@ -260,14 +282,14 @@ def get_adaptive_prompts(use_segmentation: bool) -> Dict[str, str]:
     )
 
     if use_segmentation:
-        return {
+        return MappingProxyType({
             "concept_analysis": PAPER_CONCEPT_ANALYSIS_PROMPT,
             "algorithm_analysis": PAPER_ALGORITHM_ANALYSIS_PROMPT,
             "code_planning": CODE_PLANNING_PROMPT,
-        }
+        })
     else:
-        return {
+        return MappingProxyType({
             "concept_analysis": PAPER_CONCEPT_ANALYSIS_PROMPT_TRADITIONAL,
             "algorithm_analysis": PAPER_ALGORITHM_ANALYSIS_PROMPT_TRADITIONAL,
             "code_planning": CODE_PLANNING_PROMPT_TRADITIONAL,
-        }
+        })
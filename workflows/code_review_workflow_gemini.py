@@ -10,13 +10,263 @@ This workflow reviews generated code using Google's Gemini 2.5 Pro model for:
 """
 
 import asyncio
+import aiofiles
+import contextlib
+import fnmatch
+import hashlib
+import httpx
+import io
 import json
 import logging
+import os
+import re
 import yaml
+from collections import Counter
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
 from datetime import datetime
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, RateLimitError
+
+# pathspec (optional, `pip install pathspec>=0.10`) compiles all exclude patterns
+# into one gitignore-style matcher. Without it, review_directory silently falls
+# back to Path.match per pattern, which treats "**" like "*".
+try:
+    from pathspec import GitIgnoreSpec
+
+    PATHSPEC_AVAILABLE = True
+except ImportError:
+    PATHSPEC_AVAILABLE = False
+
+# orjson (optional) parses the fenced review JSON faster than the stdlib
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Use the C (libyaml) safe loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Empty files and files above MAX_REVIEW_BYTES (typically generated) are skipped
+MAX_REVIEW_BYTES = 1024 * 1024
+
+# Files below SMALL_FILE_BYTES are packed into one request, up to MAX_BATCH_BYTES of code
+SMALL_FILE_BYTES = 2 * 1024
+MAX_BATCH_BYTES = 30 * 1024
+
+# Buffer size for writing the markdown report in as few syscalls as possible
+REPORT_WRITE_BUFFER = 1 << 20
+
+# Fenced ```json block holding the structured review (an object, or an array
+# of per-file objects for batched reviews)
+_JSON_BLOCK_RE = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL)
+_JSON_ARRAY_BLOCK_RE = re.compile(r"```json\s*(\[.*?\])\s*```", re.DOTALL)
+_JSON_DECODER = json.JSONDecoder()
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+def _extract_review_json(review_content: str) -> Optional[Dict[str, Any]]:
+    """Extract the JSON payload from a review, preferring the fenced block"""
+    match = _JSON_BLOCK_RE.search(review_content)
+    if match:
+        return _json_loads(match.group(1))
+
+    # No fenced block: decode the first balanced object after the first "{"
+    json_start = review_content.find("{")
+    if json_start < 0:
+        return None
+    review_data, _ = _JSON_DECODER.raw_decode(review_content, json_start)
+    return review_data
+
+
+def _extract_review_array(review_content: str) -> Optional[List[Any]]:
+    """Extract the JSON array of per-file reviews returned for a batched request"""
+    match = _JSON_ARRAY_BLOCK_RE.search(review_content)
+    if match:
+        return _json_loads(match.group(1))
+
+    json_start = review_content.find("[")
+    if json_start < 0:
+        return None
+    review_data, _ = _JSON_DECODER.raw_decode(review_content, json_start)
+    return review_data if isinstance(review_data, list) else None
+
+
+def _match_batch_entries(paths: List[str], entries: List[Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Map each batched file path to its entry in the model's JSON array
+
+    Entries are matched on the echoed "file" path, then on the file name when
+    the model echoed basenames or relative paths, and finally by position when
+    the array has exactly one entry per file. Entries without a string "file"
+    are only usable positionally.
+    """
+    entries = [entry for entry in entries if isinstance(entry, dict)]
+    by_path = {
+        entry["file"]: entry for entry in entries if isinstance(entry.get("file"), str)
+    }
+    if set(paths) <= by_path.keys():
+        return {fp: by_path[fp] for fp in paths}
+
+    names = [Path(fp).name for fp in paths]
+    by_name = {Path(key).name: entry for key, entry in by_path.items()}
+    unique_names = len(set(names)) == len(names)
+    if unique_names and set(names) <= by_name.keys():
+        return {fp: by_name[name] for fp, name in zip(paths, names)}
+
+    if len(entries) == len(paths):
+        return dict(zip(paths, entries))
+
+    matched = {}
+    for fp, name in zip(paths, names):
+        entry = by_path.get(fp) or (by_name.get(name) if unique_names else None)
+        if entry is not None:
+            matched[fp] = entry
+    return matched
+
+
+def _split_batches(files: List[Path]) -> Tuple[List[Path], List[List[Path]], Dict[str, int]]:
+    """
+    Split files into ones reviewed individually and batches of small files
+
+    Files under SMALL_FILE_BYTES are packed greedily into batches whose combined
+    size stays within MAX_BATCH_BYTES; a batch of one is reviewed on its own.
+    Also returns the st_size of every file that could be stat'ed, so reading
+    it later needs no second stat.
+    """
+    single: List[Path] = []
+    batches: List[List[Path]] = []
+    sizes: Dict[str, int] = {}
+    current: List[Path] = []
+    current_size = 0
+    for file_path in files:
+        try:
+            size = sizes[str(file_path)] = file_path.stat().st_size
+        except OSError:
+            size = SMALL_FILE_BYTES
+        if size >= SMALL_FILE_BYTES:
+            single.append(file_path)
+            continue
+        if current and current_size + size > MAX_BATCH_BYTES:
+            batches.append(current)
+            current, current_size = [], 0
+        current.append(file_path)
+        current_size += size
+    if current:
+        batches.append(current)
+
+    single.extend(batch[0] for batch in batches if len(batch) == 1)
+    return single, [batch for batch in batches if len(batch) > 1], sizes
+
+
+# Directories never descended into while collecting files to review
+_SKIP_DIR_NAMES = frozenset({"__pycache__"})
+
+
+def _iter_code_files(root: Path, file_pattern: str) -> Iterator[Path]:
+    """
+    Walk root with os.scandir, yielding files whose name matches file_pattern
+
+    __pycache__ and hidden directories are pruned at descent time, so their
+    contents are never listed.
+    """
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIR_NAMES and not entry.name.startswith("."):
+                            stack.append(entry.path)
+                    elif fnmatch.fnmatchcase(entry.name, file_pattern) and entry.is_file():
+                        yield Path(entry.path)
+        except OSError:
+            continue
+
+
+# Fixed parts of the per-file review prompt; only file path, context and code vary
+_PROMPT_HEAD = "Please perform a comprehensive code review of the following file:\n\n**File**: `"
+_PROMPT_CRITERIA = """Please provide a detailed review covering:
+
+1. **Code Quality** (0-10):
+   - Readability and maintainability
+   - Coding style and conventions
+   - Complexity assessment
+
+2. **Correctness** (0-10):
+   - Logic errors and bugs
+   - Edge case handling
+   - Type safety and error handling
+
+3. **Performance** (0-10):
+   - Algorithmic efficiency
+   - Resource usage
+   - Potential bottlenecks
+
+4. **Security** (0-10):
+   - Security vulnerabilities
+   - Input validation
+   - Data handling safety
+
+5. **Best Practices** (0-10):
+   - Design patterns usage
+   - SOLID principles
+   - Python/language-specific idioms
+
+6. **Documentation** (0-10):
+   - Docstrings and comments quality
+   - Code self-documentation
+   - API documentation
+
+7. **Specific Issues**: List any bugs, anti-patterns, or concerns
+
+8. **Recommendations**: Concrete improvement suggestions
+
+9. **Overall Score**: Average of above scores
+
+"""
+_REVIEW_JSON_FORMAT = """```json
+{
+  "overall_score": <average_score>,
+  "scores": {
+    "code_quality": <score>,
+    "correctness": <score>,
+    "performance": <score>,
+    "security": <score>,
+    "best_practices": <score>,
+    "documentation": <score>
+  },
+  "issues": [
+    {
+      "severity": "critical|high|medium|low",
+      "category": "bug|security|performance|style",
+      "line": <line_number or null>,
+      "description": "...",
+      "suggestion": "..."
+    }
+  ],
+  "strengths": ["..."],
+  "recommendations": ["..."],
+  "summary": "..."
+}
+```"""
+_PROMPT_TAIL = (
+    f"{_PROMPT_CRITERIA}Please provide your review in the following JSON format:\n\n"
+    f"{_REVIEW_JSON_FORMAT}"
+)
+
+# Batched-review prompt: same criteria, but one JSON array covering every file
+_BATCH_PROMPT_TAIL = (
+    f"{_PROMPT_CRITERIA}Review each file independently. Respond with a single ```json block "
+    "containing a JSON array with one object per file, in the order given. Each object must "
+    'include a "file" key holding the file path exactly as shown above, plus the fields of '
+    f"this per-file format:\n\n{_REVIEW_JSON_FORMAT}"
+)
 
 
 class CodeReviewWorkflowGemini:
@@ -32,14 +282,25 @@ class CodeReviewWorkflowGemini:
         self.gemini_config = self.api_config.get("openai", {})
         self.model_name = self.gemini_config.get("default_model", "gemini-2.5-pro")
 
+        # Concurrency limit for directory reviews and retry policy for 429s
+        self.max_concurrency = self.gemini_config.get("review_concurrency", 8)
+        self.max_rate_limit_retries = self.gemini_config.get("review_max_retries", 4)
+
         # Initialize Gemini client (via OpenAI-compatible API)
         self.client = None
+        # Created lazily inside the running event loop
+        self._client_lock: Optional[asyncio.Lock] = None
+
+        # Successful reviews keyed by (content digest, context), so identical
+        # files are only sent to the model once
+        self._review_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._review_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
 
     def _load_api_config(self, config_path: str) -> Dict[str, Any]:
         """Load API configuration from YAML file"""
         try:
             with open(config_path, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=SafeLoader)
         except Exception as e:
             raise Exception(f"Failed to load API config: {e}")
 
@@ -50,9 +311,9 @@ class CodeReviewWorkflowGemini:
         api_key = None
 
         try:
-            with open(secrets_path, "r", encoding="utf-8") as f:
-                secrets = yaml.safe_load(f)
-                api_key = secrets.get("openai", {}).get("api_key", "")
+            async with aiofiles.open(secrets_path, "r", encoding="utf-8") as f:
+                secrets = yaml.load(await f.read(), Loader=SafeLoader)
+            api_key = secrets.get("openai", {}).get("api_key", "")
         except Exception as e:
             self.logger.warning(f"Could not load secrets file: {e}")
 
@@ -62,155 +323,302 @@ class CodeReviewWorkflowGemini:
         # Get base URL for Gemini (Google AI Studio)
         base_url = self.gemini_config.get("base_url", "https://generativelanguage.googleapis.com/v1beta/openai/")
 
+        # Size the connection pool for concurrent reviews so connections are kept alive and reused
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency * 2,
+                max_keepalive_connections=self.max_concurrency
+            )
+        )
+
         client = AsyncOpenAI(
             api_key=api_key,
-            base_url=base_url
+            base_url=base_url,
+            http_client=http_client
         )
 
         self.logger.info(f"✅ Gemini client initialized: {self.model_name}")
         return client
 
-    async def review_code_file(self, file_path: str, context: str = "") -> Dict[str, Any]:
+    async def _get_client(self) -> AsyncOpenAI:
+        """Return the shared client, initializing it exactly once"""
+        if self.client is None:
+            if self._client_lock is None:
+                self._client_lock = asyncio.Lock()
+            async with self._client_lock:
+                if self.client is None:
+                    self.client = await self._initialize_gemini_client()
+        return self.client
+
+    async def aclose(self) -> None:
+        """Close the shared client and its pooled HTTP connections, if one was created"""
+        client, self.client = self.client, None
+        self._client_lock = None
+        if client is not None:
+            await client.close()
+
+    async def _complete(self, client: AsyncOpenAI, review_prompt: str, label: str) -> str:
         """
-        Review a single code file
-
-        Args:
-            file_path: Path to the code file to review
-            context: Additional context about the file (e.g., purpose, related files)
+        Stream one review completion and return its text
 
-        Returns:
-            Dict containing review results
+        Backs off exponentially only when throttled; closing the stream on exit
+        aborts the request if the caller cancels mid-generation.
+        """
+        for attempt in range(self.max_rate_limit_retries + 1):
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an expert code reviewer with deep knowledge of software engineering best practices, security, performance optimization, and maintainability."
+                        },
+                        {
+                            "role": "user",
+                            "content": review_prompt
+                        }
+                    ],
+                    temperature=0.3,  # Lower temperature for more focused, analytical reviews
+                    max_tokens=self.gemini_config.get("base_max_tokens", 20000),
+                    stream=True
+                )
+                break
+            except RateLimitError:
+                if attempt == self.max_rate_limit_retries:
+                    raise
+                delay = 2 ** attempt
+                self.logger.warning(f"⏳ Rate limited while reviewing {label}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+        buffer = io.StringIO()
+        try:
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    buffer.write(chunk.choices[0].delta.content)
+        finally:
+            await response.close()
+        return buffer.getvalue()
+
+    async def _read_code_file(
+        self, file_path: str, size: Optional[int] = None
+    ) -> Tuple[Optional[str], Optional[str], Optional[Dict[str, Any]]]:
         """
-        if not self.client:
-            self.client = await self._initialize_gemini_client()
+        Read a file for review, sized by a single stat call
+
+        size is the file's st_size when the caller already stat'ed it; the file
+        is only stat'ed here when it is None.
 
-        # Read file content
+        Returns (content, digest, None) for files to review, where digest is the
+        blake2b hash of the raw bytes, or (None, None, result) when the file is
+        empty, larger than MAX_REVIEW_BYTES or unreadable.
+        """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                code_content = f.read()
+            if size is None:
+                size = os.stat(file_path).st_size
+            if size == 0:
+                return None, None, {"file": file_path, "status": "skipped", "reason": "empty file"}
+            if size > MAX_REVIEW_BYTES:
+                return None, None, {
+                    "file": file_path,
+                    "status": "skipped_too_large",
+                    "reason": f"{size} bytes exceeds {MAX_REVIEW_BYTES} byte limit"
+                }
+
+            # Read exactly st_size bytes without blocking the event loop
+            async with aiofiles.open(file_path, "rb", buffering=0) as f:
+                data = await f.read(size)
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            return data.decode("utf-8", errors="replace"), digest, None
         except Exception as e:
-            return {
+            return None, None, {
                 "file": file_path,
                 "status": "error",
                 "error": f"Failed to read file: {e}"
             }
 
-        # Construct review prompt
-        review_prompt = self._build_review_prompt(file_path, code_content, context)
+    def _cached_review(self, cache_key: Tuple[str, str], file_path: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached review for cache_key, relabelled for file_path"""
+        cached = self._review_cache.get(cache_key)
+        if cached is None:
+            return None
+        self.logger.info(f"♻️ Reusing review of identical file {cached['file']} for {file_path}")
+        return {**cached, "file": file_path, "duplicate_of": cached["file"]}
 
-        # Call Gemini API
+    @contextlib.asynccontextmanager
+    async def _content_lock(self, cache_key: Tuple[str, str]) -> AsyncIterator[None]:
+        """
+        Hold the per-content lock guarding the review cache entry for cache_key
+
+        The lock is dropped from _review_locks as soon as it is released: by then
+        the cache entry exists (or the review failed), so later callers only need
+        the cache, and the dict does not grow with every reviewed file.
+        """
+        lock = self._review_locks.setdefault(cache_key, asyncio.Lock())
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert code reviewer with deep knowledge of software engineering best practices, security, performance optimization, and maintainability."
-                    },
-                    {
-                        "role": "user",
-                        "content": review_prompt
-                    }
-                ],
-                temperature=0.3,  # Lower temperature for more focused, analytical reviews
-                max_tokens=self.gemini_config.get("base_max_tokens", 20000)
-            )
+            async with lock:
+                yield
+        finally:
+            if self._review_locks.get(cache_key) is lock and not lock.locked():
+                del self._review_locks[cache_key]
+
+    async def review_code_file(
+        self, file_path: str, context: str = "", size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Review a single code file
 
-            review_content = response.choices[0].message.content
+        Args:
+            file_path: Path to the code file to review
+            context: Additional context about the file (e.g., purpose, related files)
+            size: File size in bytes if already known, to avoid a second stat
 
-            return {
+        Returns:
+            Dict containing review results
+        """
+        client = await self._get_client()
+
+        code_content, digest, skip_result = await self._read_code_file(file_path, size)
+        if skip_result is not None:
+            return skip_result
+
+        # Concurrent reviews of identical content wait for the first one
+        cache_key = (digest, context)
+        async with self._content_lock(cache_key):
+            cached = self._cached_review(cache_key, file_path)
+            if cached is not None:
+                return cached
+
+            # Construct review prompt
+            review_prompt = self._build_review_prompt(file_path, code_content, context)
+
+            # Call Gemini API
+            try:
+                review_content = await self._complete(client, review_prompt, file_path)
+            except Exception as e:
+                self.logger.error(f"Failed to review {file_path}: {e}")
+                return {
+                    "file": file_path,
+                    "status": "error",
+                    "error": str(e)
+                }
+
+            result = {
                 "file": file_path,
                 "status": "success",
                 "review": review_content,
                 "model": self.model_name,
                 "timestamp": datetime.now().isoformat()
             }
+            self._review_cache[cache_key] = result
+            return result
 
-        except Exception as e:
-            self.logger.error(f"Failed to review {file_path}: {e}")
-            return {
-                "file": file_path,
-                "status": "error",
-                "error": str(e)
-            }
-
-    def _build_review_prompt(self, file_path: str, code_content: str, context: str) -> str:
-        """Build comprehensive code review prompt"""
-        return f"""Please perform a comprehensive code review of the following file:
-
-**File**: `{file_path}`
-**Context**: {context if context else "No additional context provided"}
-
-**Code**:
-```
-{code_content}
-```
-
-Please provide a detailed review covering:
-
-1. **Code Quality** (0-10):
-   - Readability and maintainability
-   - Coding style and conventions
-   - Complexity assessment
-
-2. **Correctness** (0-10):
-   - Logic errors and bugs
-   - Edge case handling
-   - Type safety and error handling
-
-3. **Performance** (0-10):
-   - Algorithmic efficiency
-   - Resource usage
-   - Potential bottlenecks
-
-4. **Security** (0-10):
-   - Security vulnerabilities
-   - Input validation
-   - Data handling safety
-
-5. **Best Practices** (0-10):
-   - Design patterns usage
-   - SOLID principles
-   - Python/language-specific idioms
+    async def review_code_batch(
+        self, file_paths: List[str], sizes: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Review several small files with a single request
 
-6. **Documentation** (0-10):
-   - Docstrings and comments quality
-   - Code self-documentation
-   - API documentation
+        Args:
+            file_paths: Paths of the files to review together
+            sizes: Known file sizes in bytes by path, to avoid a second stat
 
-7. **Specific Issues**: List any bugs, anti-patterns, or concerns
+        Returns:
+            List of per-file review results, in the order of file_paths. Files
+            the model left out of its answer are reviewed individually.
+        """
+        client = await self._get_client()
+        sizes = sizes or {}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        # First path seen for each digest; later identical files copy its review
+        first_by_digest: Dict[str, str] = {}
+        contents: Dict[str, str] = {}
+        duplicates: Dict[str, str] = {}
+        for file_path in file_paths:
+            code_content, digest, skip_result = await self._read_code_file(
+                file_path, sizes.get(file_path)
+            )
+            if skip_result is not None:
+                results[file_path] = skip_result
+            elif digest in first_by_digest:
+                duplicates[file_path] = first_by_digest[digest]
+            else:
+                first_by_digest[digest] = file_path
+                contents[file_path] = code_content
+
+        # Check and fill the cache under the same per-content locks as
+        # review_code_file (taken in sorted order, so batches cannot deadlock)
+        async with contextlib.AsyncExitStack() as stack:
+            for digest in sorted(first_by_digest):
+                await stack.enter_async_context(self._content_lock((digest, "")))
+
+            # Content already reviewed elsewhere is not sent again
+            pending: Dict[str, str] = {}
+            for digest, file_path in first_by_digest.items():
+                cached = self._cached_review((digest, ""), file_path)
+                if cached is not None:
+                    results[file_path] = cached
+                else:
+                    pending[digest] = file_path
+
+            batched_paths = list(pending.values())
+            if batched_paths:
+                sections = "".join(
+                    f"### File {i}: `{fp}`\n\n```\n{contents[fp]}\n```\n\n"
+                    for i, fp in enumerate(batched_paths, 1)
+                )
+                review_prompt = (
+                    f"Please perform a comprehensive code review of each of the following "
+                    f"{len(batched_paths)} files:\n\n{sections}{_BATCH_PROMPT_TAIL}"
+                )
+                # API errors (auth, exhausted rate-limit retries, ...) propagate to the
+                # caller; only an unparseable answer falls back to per-file reviews
+                review_content = await self._complete(
+                    client, review_prompt, f"batch of {len(batched_paths)} files"
+                )
+                try:
+                    entries = _extract_review_array(review_content) or []
+                except ValueError as e:
+                    self.logger.warning(f"Could not parse batched review, reviewing files individually: {e}")
+                    entries = []
+                by_path = _match_batch_entries(batched_paths, entries)
+
+                timestamp = datetime.now().isoformat()
+                for digest, file_path in pending.items():
+                    entry = by_path.get(file_path)
+                    if entry is None:
+                        continue
+                    results[file_path] = {
+                        "file": file_path,
+                        "status": "success",
+                        "review": f"```json\n{json.dumps(entry, indent=2, ensure_ascii=False)}\n```",
+                        "model": self.model_name,
+                        "timestamp": timestamp
+                    }
+                    self._review_cache[(digest, "")] = results[file_path]
 
-8. **Recommendations**: Concrete improvement suggestions
+        for file_path, original in duplicates.items():
+            if original in results:
+                results[file_path] = {
+                    **results[original], "file": file_path, "duplicate_of": original
+                }
 
-9. **Overall Score**: Average of above scores
+        # Re-review one file at a time: this batch holds a single concurrency slot
+        missing = [fp for fp in file_paths if fp not in results]
+        if missing:
+            self.logger.info(f"🔁 Reviewing {len(missing)} file(s) missing from batched answer individually")
+            for file_path in missing:
+                results[file_path] = await self.review_code_file(file_path, size=sizes.get(file_path))
 
-Please provide your review in the following JSON format:
+        return [results[fp] for fp in file_paths]
 
-```json
-{{
-  "overall_score": <average_score>,
-  "scores": {{
-    "code_quality": <score>,
-    "correctness": <score>,
-    "performance": <score>,
-    "security": <score>,
-    "best_practices": <score>,
-    "documentation": <score>
-  }},
-  "issues": [
-    {{
-      "severity": "critical|high|medium|low",
-      "category": "bug|security|performance|style",
-      "line": <line_number or null>,
-      "description": "...",
-      "suggestion": "..."
-    }}
-  ],
-  "strengths": ["..."],
-  "recommendations": ["..."],
-  "summary": "..."
-}}
-```"""
+    def _build_review_prompt(self, file_path: str, code_content: str, context: str) -> str:
+        """Build comprehensive code review prompt"""
+        return (
+            f"{_PROMPT_HEAD}{file_path}`\n"
+            f"**Context**: {context if context else 'No additional context provided'}\n\n"
+            f"**Code**:\n```\n{code_content}\n```\n\n{_PROMPT_TAIL}"
+        )
 
     async def review_directory(
         self,
@@ -224,7 +632,8 @@ Please provide your review in the following JSON format:
         Args:
             directory_path: Path to directory containing code
             file_pattern: Glob pattern for files to review
-            exclude_patterns: List of patterns to exclude
+            exclude_patterns: List of patterns to exclude (gitignore syntax when
+                pathspec is installed, otherwise matched with Path.match)
 
         Returns:
             Dict containing aggregated review results
@@ -239,73 +648,106 @@ Please provide your review in the following JSON format:
                 "error": f"Directory not found: {directory_path}"
             }
 
-        # Find all matching files
-        all_files = list(directory.rglob(file_pattern))
+        # Find all matching files (excluded directory trees are never walked)
+        all_files = _iter_code_files(directory, file_pattern)
 
         # Filter out excluded patterns
-        files_to_review = []
-        for file_path in all_files:
-            should_exclude = False
-            for pattern in exclude_patterns:
-                if file_path.match(pattern):
-                    should_exclude = True
-                    break
-            if not should_exclude:
-                files_to_review.append(file_path)
+        if PATHSPEC_AVAILABLE:
+            spec = GitIgnoreSpec.from_lines(exclude_patterns)
+            files_to_review = [
+                file_path for file_path in all_files
+                if not spec.match_file(file_path.relative_to(directory).as_posix())
+            ]
+        else:
+            files_to_review = [
+                file_path for file_path in all_files
+                if not any(file_path.match(pattern) for pattern in exclude_patterns)
+            ]
 
         self.logger.info(f"📁 Found {len(files_to_review)} files to review in {directory_path}")
 
-        # Review each file
-        reviews = []
-        for file_path in files_to_review:
-            self.logger.info(f"🔍 Reviewing: {file_path.name}")
-            review = await self.review_code_file(str(file_path))
-            reviews.append(review)
-
-            # Add small delay to avoid rate limiting
-            await asyncio.sleep(1)
+        # The pooled client is only created when there is something to review,
+        # and its connections are released as soon as the reviews are done
+        try:
+            reviews = await self._review_files(files_to_review) if files_to_review else []
+        finally:
+            await self.aclose()
 
         # Aggregate results
         return self._aggregate_reviews(reviews, directory_path)
 
+    async def _review_files(self, files_to_review: List[Path]) -> List[Dict[str, Any]]:
+        """Review the given files concurrently, returning results in the same order"""
+        # Initialize the client once up front so concurrent reviews share it
+        await self._get_client()
+
+        # Pack small files into shared requests; larger ones are reviewed alone
+        single_files, batches, sizes = _split_batches(files_to_review)
+
+        # Review concurrently, bounded by max_concurrency (a batch takes one slot)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _review_one(file_path: Path) -> List[Dict[str, Any]]:
+            async with semaphore:
+                self.logger.info(f"🔍 Reviewing: {file_path.name}")
+                return [await self.review_code_file(str(file_path), size=sizes.get(str(file_path)))]
+
+        async def _review_batch(batch: List[Path]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                self.logger.info(f"🔍 Reviewing batch: {', '.join(fp.name for fp in batch)}")
+                return await self.review_code_batch([str(fp) for fp in batch], sizes)
+
+        groups = [[fp] for fp in single_files] + batches
+        results = await asyncio.gather(
+            *[_review_one(fp) for fp in single_files],
+            *[_review_batch(batch) for batch in batches],
+            return_exceptions=True
+        )
+        reviews_by_file = {}
+        for group, result in zip(groups, results):
+            if isinstance(result, Exception):
+                result = [{"file": str(fp), "status": "error", "error": str(result)} for fp in group]
+            for review in result:
+                reviews_by_file[review["file"]] = review
+        return [reviews_by_file[str(fp)] for fp in files_to_review]
+
     def _aggregate_reviews(self, reviews: List[Dict[str, Any]], directory_path: str) -> Dict[str, Any]:
         """Aggregate individual file reviews into summary report"""
         successful_reviews = [r for r in reviews if r["status"] == "success"]
         failed_reviews = [r for r in reviews if r["status"] == "error"]
+        skipped_count = sum(r["status"].startswith("skipped") for r in reviews)
 
-        # Parse scores from reviews
+        # Parse scores from reviews. Issues are only counted, so keep just their
+        # severities as one flat column instead of holding every issue dict.
         all_scores = []
-        all_issues = []
+        issue_severities: List[Optional[str]] = []
 
         for review in successful_reviews:
             try:
                 # Try to extract JSON from review content
-                review_content = review["review"]
-
-                # Find JSON block in the review
-                json_start = review_content.find("{")
-                json_end = review_content.rfind("}") + 1
-
-                if json_start >= 0 and json_end > json_start:
-                    json_str = review_content[json_start:json_end]
-                    review_data = json.loads(json_str)
+                review_data = _extract_review_json(review["review"])
 
+                if isinstance(review_data, dict):
                     if "overall_score" in review_data:
                         all_scores.append(review_data["overall_score"])
 
                     if "issues" in review_data:
-                        all_issues.extend(review_data["issues"])
+                        issue_severities.extend(
+                            issue.get("severity") if isinstance(issue, dict) else None
+                            for issue in review_data["issues"]
+                        )
             except Exception as e:
                 self.logger.warning(f"Could not parse review JSON for {review['file']}: {e}")
 
         # Calculate aggregate scores
         avg_score = sum(all_scores) / len(all_scores) if all_scores else 0
 
-        # Count issues by severity
-        critical_count = len([i for i in all_issues if i.get("severity") == "critical"])
-        high_count = len([i for i in all_issues if i.get("severity") == "high"])
-        medium_count = len([i for i in all_issues if i.get("severity") == "medium"])
-        low_count = len([i for i in all_issues if i.get("severity") == "low"])
+        # Count issues by severity in a single pass
+        severity_counts = Counter(issue_severities)
+        critical_count = severity_counts["critical"]
+        high_count = severity_counts["high"]
+        medium_count = severity_counts["medium"]
+        low_count = severity_counts["low"]
 
         return {
             "directory": directory_path,
@@ -316,8 +758,9 @@ Please provide your review in the following JSON format:
                 "total_files": len(reviews),
                 "reviewed_successfully": len(successful_reviews),
                 "review_failed": len(failed_reviews),
+                "skipped_files": skipped_count,
                 "average_score": round(avg_score, 2),
-                "total_issues": len(all_issues),
+                "total_issues": len(issue_severities),
                 "critical_issues": critical_count,
                 "high_issues": high_count,
                 "medium_issues": medium_count,
@@ -326,6 +769,37 @@ Please provide your review in the following JSON format:
             "reviews": reviews
         }
 
+    def _iter_report_sections(self, review_results: Dict[str, Any]) -> Iterator[str]:
+        """Yield the report in sections (header/summary, then one per file review)"""
+        summary = review_results["summary"]
+        yield "\n".join([
+            "# Code Review Report",
+            f"\n**Generated**: {review_results['timestamp']}",
+            f"**Model**: {review_results['model']}",
+            f"**Directory**: {review_results['directory']}\n",
+            "## Summary\n",
+            f"- **Total Files**: {summary['total_files']}",
+            f"- **Successfully Reviewed**: {summary['reviewed_successfully']}",
+            f"- **Failed Reviews**: {summary['review_failed']}",
+            f"- **Skipped Files**: {summary.get('skipped_files', 0)}",
+            f"- **Average Score**: {summary['average_score']}/10",
+            f"- **Total Issues**: {summary['total_issues']}",
+            f"  - Critical: {summary['critical_issues']}",
+            f"  - High: {summary['high_issues']}",
+            f"  - Medium: {summary['medium_issues']}",
+            f"  - Low: {summary['low_issues']}\n",
+            "## Detailed Reviews\n",
+        ])
+
+        # Individual file reviews
+        for review in review_results["reviews"]:
+            if review["status"] == "success":
+                yield f"\n### {review['file']}\n\n{review['review']}\n\n---\n"
+            elif review["status"].startswith("skipped"):
+                yield f"\n### {review['file']} ⏭️\n\n**Skipped**: {review['reason']}\n\n\n---\n"
+            else:
+                yield f"\n### {review['file']} ❌\n\n**Error**: {review['error']}\n\n\n---\n"
+
     async def generate_review_report(
         self,
         review_results: Dict[str, Any],
@@ -334,6 +808,10 @@ Please provide your review in the following JSON format:
         """
         Generate a formatted review report
 
+        Sections are assembled in one in-memory buffer and written to
+        output_path in a single call through a 1MB file buffer, so even a
+        multi-MB report costs a handful of write syscalls.
+
         Args:
             review_results: Results from review_directory()
             output_path: Optional path to save the report
@@ -341,47 +819,18 @@ Please provide your review in the following JSON format:
         Returns:
             Formatted report as markdown string
         """
-        report_lines = []
-
-        # Header
-        report_lines.append(f"# Code Review Report")
-        report_lines.append(f"\n**Generated**: {review_results['timestamp']}")
-        report_lines.append(f"**Model**: {review_results['model']}")
-        report_lines.append(f"**Directory**: {review_results['directory']}\n")
-
-        # Summary
-        summary = review_results["summary"]
-        report_lines.append("## Summary\n")
-        report_lines.append(f"- **Total Files**: {summary['total_files']}")
-        report_lines.append(f"- **Successfully Reviewed**: {summary['reviewed_successfully']}")
-        report_lines.append(f"- **Failed Reviews**: {summary['review_failed']}")
-        report_lines.append(f"- **Average Score**: {summary['average_score']}/10")
-        report_lines.append(f"- **Total Issues**: {summary['total_issues']}")
-        report_lines.append(f"  - Critical: {summary['critical_issues']}")
-        report_lines.append(f"  - High: {summary['high_issues']}")
-        report_lines.append(f"  - Medium: {summary['medium_issues']}")
-        report_lines.append(f"  - Low: {summary['low_issues']}\n")
-
-        # Individual file reviews
-        report_lines.append("## Detailed Reviews\n")
-
-        for review in review_results["reviews"]:
-            if review["status"] == "success":
-                report_lines.append(f"### {review['file']}\n")
-                report_lines.append(review["review"])
-                report_lines.append("\n---\n")
-            else:
-                report_lines.append(f"### {review['file']} ❌\n")
-                report_lines.append(f"**Error**: {review['error']}\n")
-                report_lines.append("\n---\n")
-
-        report = "\n".join(report_lines)
+        buffer = io.StringIO()
+        for section in self._iter_report_sections(review_results):
+            buffer.write(section)
+        report = buffer.getvalue()
 
         # Save to file if output_path provided
         if output_path:
             try:
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(report)
+                async with aiofiles.open(
+                    output_path, "w", encoding="utf-8", buffering=REPORT_WRITE_BUFFER
+                ) as f:
+                    await f.write(report)
                 self.logger.info(f"✅ Report saved to: {output_path}")
             except Exception as e:
                 self.logger.error(f"Failed to save report: {e}")